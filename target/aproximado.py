@@ -0,0 +1,110 @@
+import hashlib
+import math
+
+import numpy as np
+
+# Modo aproximado del top N: cada proceso resume sus conteos en un Count-Min
+# Sketch de tamaño fijo (depende solo de epsilon y delta, no del vocabulario
+# ni del corpus) y los resúmenes se combinan sumando las tablas elemento a
+# elemento, por ejemplo con un Allreduce. La estimación de una palabra nunca
+# es menor que su cuenta real y la supera en a lo sumo epsilon * N (N =
+# palabras contadas) con probabilidad al menos 1 - delta.
+EPSILON = 0.001
+DELTA = 0.01
+
+
+def posiciones(palabras, ancho, profundidad):
+    """
+    Columna de cada palabra en cada fila, forma (len(palabras), profundidad).
+    Se usa blake2b (y no hash(), que cambia entre procesos) con doble hashing:
+    fila i -> (h1 + i * h2) mod ancho.
+    """
+    h = np.array([np.frombuffer(hashlib.blake2b(p if isinstance(p, bytes) else p.encode("utf-8"),
+                                                digest_size=16).digest(), dtype=np.uint64)
+                  for p in palabras], dtype=np.uint64).reshape(-1, 2)
+    filas = np.arange(profundidad, dtype=np.uint64)
+    return ((h[:, :1] + filas * (h[:, 1:] | np.uint64(1))) % np.uint64(ancho)).astype(np.int64)
+
+
+class CountMin:
+    """Count-Min Sketch de profundidad ceil(ln(1/delta)) filas por ancho ceil(e/epsilon) columnas."""
+
+    def __init__(self, epsilon=EPSILON, delta=DELTA):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.ancho = math.ceil(math.e / epsilon)
+        self.profundidad = max(1, math.ceil(math.log(1 / delta)))
+        self.tabla = np.zeros((self.profundidad, self.ancho), dtype=np.int64)
+
+    def agregar(self, conteo):
+        """Suma al sketch un conteo exacto {palabra: cuenta} (por ejemplo, el de un bloque)."""
+        if not conteo:
+            return
+        palabras = list(conteo)
+        columnas = posiciones(palabras, self.ancho, self.profundidad)
+        filas = np.broadcast_to(np.arange(self.profundidad), columnas.shape)
+        cuentas = np.broadcast_to(np.fromiter(conteo.values(), dtype=np.int64, count=len(palabras))[:, None],
+                                  columnas.shape)
+        np.add.at(self.tabla, (filas, columnas), cuentas)
+
+    def combinar(self, otro):
+        self.tabla += otro.tabla
+        return self
+
+    @property
+    def total(self):
+        """Palabras contadas (cada fila suma el total)."""
+        return int(self.tabla[0].sum())
+
+    def error(self):
+        """Cota del error por palabra: estimación - cuenta real <= error() con probabilidad >= 1 - delta."""
+        return math.e / self.ancho * self.total
+
+    def estimar(self, palabras):
+        """Estimación (cota superior) de la cuenta de cada palabra."""
+        columnas = posiciones(palabras, self.ancho, self.profundidad)
+        return self.tabla[np.arange(self.profundidad), columnas].min(axis=1)
+
+    def top(self, candidatas, n):
+        """Las n candidatas con mayor estimación, como [(palabra, estimación)]."""
+        candidatas = sorted(candidatas)
+        if not candidatas:
+            return []
+        estimaciones = self.estimar(candidatas)
+        orden = np.argsort(-estimaciones, kind="stable")[:n]
+        return [(candidatas[i], int(estimaciones[i])) for i in orden if estimaciones[i] > 0]
+
+    def resumen(self):
+        """Parámetros y cota de error, para la salida JSON."""
+        return {"epsilon": self.epsilon, "delta": self.delta, "ancho": self.ancho, "profundidad": self.profundidad,
+                "total": self.total, "error": self.error()}
+
+
+def combinar(sketches):
+    """Suma varios sketches con los mismos parámetros (un nodo de un árbol de reducción)."""
+    sketches = list(sketches)
+    total = CountMin(sketches[0].epsilon, sketches[0].delta)
+    for s in sketches:
+        total.combinar(s)
+    return total
+
+
+def imprimir_top(top, resumen, nombre):
+    """Imprime el top aproximado con la cota de error de resumen (CountMin.resumen())."""
+    print(f"Top {len(top)} palabras de {nombre} (aproximado, Count-Min {resumen['profundidad']}x{resumen['ancho']}):")
+    for palabra, cuenta in top:
+        print(f"  {palabra}: {cuenta}")
+    print(f"Error estimado: cada cuenta supera a la real en a lo sumo {resumen['error']:.0f} "
+          f"(epsilon={resumen['epsilon']} de {resumen['total']} palabras) "
+          f"con probabilidad >= {1 - resumen['delta']:g}")
+
+
+def agregar_opciones(parser):
+    """Opciones --aproximado, --epsilon y --delta comunes a los programas de frecuencia de palabras."""
+    parser.add_argument("--aproximado", action="store_true",
+                        help="top N aproximado con un Count-Min Sketch de tamaño fijo por proceso en lugar "
+                             "de contadores exactos")
+    parser.add_argument("--epsilon", type=float, default=EPSILON,
+                        help="error relativo máximo del modo aproximado (fracción de las palabras contadas)")
+    parser.add_argument("--delta", type=float, default=DELTA,
+                        help="probabilidad de que una cuenta aproximada supere la cota de error")
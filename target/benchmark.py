@@ -1,5 +1,5 @@
+import argparse
 import subprocess
-import re
 import os
 import sys
 import glob
@@ -7,11 +7,19 @@ import time
 import contextlib
 import io
 import csv
+import statistics
 
 # Ensure we can import generator
 # Assuming this script is in target/ and generator is in target/
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import generator
+import salida
+import servicio
+
+# Puertos de los servicios persistentes (--servicio), por etiqueta del CSV: sus
+# filas miden ejecutar.trabajo_wordfreq en pools calientes, no wordFreqMPI.py
+# ni wordFreqDask.py, así que llevan su propia etiqueta y su propio CSV
+SERVICE_PORTS = {"MPI-pool": 5758, "Dask-pool": 5757}
 
 def run_command(command):
     """Runs a shell command and returns the stdout. Prints error if fails."""
@@ -29,16 +37,85 @@ def run_command(command):
         print(e)
         return ""
 
-def extract_time(output):
-    """Extracts execution time from output using a flexible regex."""
-    if not output:
-        return None
-    # Regex flexible to handle potential encoding issues (e.g. ejecuciÃ³n vs ejecución)
-    # Matches "Tiempo de" followed by anything until ": " and the number
-    match = re.search(r"Tiempo de .*: (\d+\.\d+) segundos", output)
-    if match:
-        return float(match.group(1))
-    return None
+def run_trials(command, warmup, trials):
+    """
+    Runs a command (which must accept --json) warmup + trials times and returns
+    the JSON records of the measured trials. Runs without a JSON result are
+    reported and skipped instead of being recorded silently.
+    """
+    records = []
+    for i in range(warmup + trials):
+        output = run_command(f"{command} --json")
+        record = salida.leer_json(output)
+        if record is None:
+            print(f"  [WARN] No JSON result from: {command}")
+            continue
+        if i >= warmup:
+            records.append(record)
+    return records
+
+def measure(command, warmup, trials):
+    """In-process times of the measured trials of a command (see run_trials)."""
+    return [record["tiempo"] for record in run_trials(command, warmup, trials)]
+
+def summarize(times):
+    """Median, p95, mean, stddev and min of a list of times (None values if empty)."""
+    if not times:
+        return {"Median": None, "P95": None, "Mean": None, "Std": None, "Min": None, "Runs": 0}
+    ordered = sorted(times)
+    # Percentil 95 con interpolación lineal entre las dos muestras vecinas
+    pos = 0.95 * (len(ordered) - 1)
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    p95 = ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+    return {"Median": statistics.median(ordered), "P95": p95, "Mean": statistics.fmean(ordered),
+            "Std": statistics.stdev(ordered) if len(ordered) > 1 else 0.0, "Min": ordered[0], "Runs": len(ordered)}
+
+def start_services(target_dir):
+    """Starts the warm MPI pool and Dask cluster services and waits until they accept jobs."""
+    commands = {
+        "MPI-pool": f'docker run --rm -v "{target_dir}:/app" --network host augustosalazar/slim-mpi mpiexec --allow-run-as-root --oversubscribe -n 1 python /app/servicio.py servir --backend mpi --puerto {SERVICE_PORTS["MPI-pool"]}',
+        "Dask-pool": f'docker run --rm -v "{target_dir}:/app" --network host daskdev/dask:latest python /app/servicio.py servir --backend dask --puerto {SERVICE_PORTS["Dask-pool"]}',
+    }
+    processes = {}
+    for label, command in commands.items():
+        print(f"Starting {label} service...")
+        processes[label] = subprocess.Popen(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not servicio.esperar(puerto=SERVICE_PORTS[label], timeout=120):
+            print(f"  [WARN] {label} service did not start.")
+    return processes
+
+def stop_services(processes):
+    for label, process in processes.items():
+        try:
+            servicio.enviar({"trabajo": "detener"}, puerto=SERVICE_PORTS[label], timeout=30)
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def run_service_job(label, n, warmup, trials):
+    """
+    Runs the word count warmup + trials times on the warm service. Returns
+    (compute times of the measured trials, pool start-up time).
+    """
+    times, startup = [], None
+    for i in range(warmup + trials):
+        try:
+            response = servicio.enviar({"trabajo": "wordfreq", "workers": n}, puerto=SERVICE_PORTS[label])
+        except OSError as e:
+            print(f"\n[EXCEPTION] Could not reach {label} service: {e}")
+            break
+        if not response.get("ok"):
+            print(f"\n[ERROR] {label} service: {response.get('error')}")
+            continue
+        if response["arranque"] > 0:
+            startup = response["arranque"]
+        if i >= warmup:
+            times.append(response["tiempo"])
+    return times, startup
 
 def clean_files(target_dir):
     """Removes generated text files."""
@@ -49,7 +126,21 @@ def clean_files(target_dir):
         except OSError as e:
             print(f"Error deleting {f}: {e}")
 
-def main():
+def write_csv(csv_file, fieldnames, rows):
+    print(f"\nWriting results to {csv_file}...")
+    try:
+        with open(csv_file, mode='w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        print("CSV write successful.")
+    except Exception as e:
+        print(f"Error writing CSV: {e}")
+
+def suite_wordfreq(args, target_dir):
+    """Sequential vs MPI vs Dask word frequency over growing corpora (benchmark_results.csv)."""
+    warmup, trials = args.calentamiento, args.repeticiones
+
     # --- Configuration ---
     file_counts = [10, 50, 100, 500]
     # Configuración para PC con 4 núcleos físicos / 8 hilos lógicos
@@ -57,16 +148,10 @@ def main():
     # 4: Núcleos físicos (Punto óptimo teórico para CPU-bound puro)
     # 8: Hilos lógicos (Uso de Hyper-threading)
     worker_counts = [1,2,4,8]
-    
-    # --- Paths ---
-    # We assume the script is run from the root MPI directory
-    current_dir = os.getcwd() 
-    target_dir = os.path.join(current_dir, "target")
-    
-    # Check if we are in the right place
-    if not os.path.exists(target_dir):
-        print("Error: 'target' directory not found. Please run from the root 'MPI' directory.")
-        return
+    # Estrategias de comunicación de wordFreqMPI (--estrategia) y su etiqueta en el CSV
+    # (con --servicio, el pool de MPI no usa wordFreqMPI.py y hay una sola etiqueta)
+    mpi_strategies = {"pool": "MPI-pool"} if args.servicio else {"colectiva": "MPI", "p2p": "MPI-p2p"}
+    dask_label = "Dask-pool" if args.servicio else "Dask"
 
     # Structure to hold results
     results = {}
@@ -82,6 +167,7 @@ def main():
     clean_files(target_dir)
     
     files_generated_so_far = 0
+    services = start_services(target_dir) if args.servicio else {}
 
     for count in file_counts:
         print(f"\n" + "="*40)
@@ -90,17 +176,20 @@ def main():
         
         results[count] = {
             "Sequential": None,
-            "MPI": {},
-            "Dask": {}
+            dask_label: {}
         }
+        for label in mpi_strategies.values():
+            results[count][label] = {}
         
         # 1. Incremental Generation
         needed = count - files_generated_so_far
         if needed > 0:
             print(f"Generating {needed} new files (starting from {files_generated_so_far + 1})...")
-            # Suppress generator output to keep console clean
+            # Suppress generator output to keep console clean; every batch reuses the same seed
             with contextlib.redirect_stdout(io.StringIO()):
-                generator.generar_textos_español(num_files=needed, start_index=files_generated_so_far + 1)
+                args.semilla = generator.generar_textos_español(num_files=needed, start_index=files_generated_so_far + 1,
+                                                                 semilla=args.semilla)
+            print(f"Corpus seed: {args.semilla}")
             files_generated_so_far = count
         else:
             print(f"Files already generated ({files_generated_so_far}). Skipping generation.")
@@ -108,60 +197,79 @@ def main():
         # 2. Run Sequential (Once per file count)
         print("Running Sequential...")
         cmd_seq = f"python target/wordFreq.py"
-        out_seq = run_command(cmd_seq)
-        time_seq = extract_time(out_seq)
+        stats_seq = summarize(measure(cmd_seq, warmup, trials))
+        time_seq = stats_seq["Median"]
         results[count]["Sequential"] = time_seq
-        print(f"  -> Sequential Time: {time_seq} s")
+        print(f"  -> Sequential Time: {time_seq} s (p95 {stats_seq['P95']} s, {stats_seq['Runs']} runs)")
         
-        # Add to CSV rows
+        # Add to CSV rows (Time = median of the trials)
         csv_rows.append({
             "Files": count,
             "Type": "Sequential",
             "Workers": 1,
-            "Time": time_seq
+            "Time": time_seq,
+            "Startup": None,
+            **stats_seq
         })
 
         # Loop over worker counts for Parallel implementations
         for n in worker_counts:
-            # 3. Run MPI
-            print(f"Running MPI with {n} processes...")
-            # --oversubscribe is crucial for running more processes than physical cores
-            cmd_mpi = f'docker run --rm -v "{target_dir}:/app" augustosalazar/slim-mpi mpiexec --allow-run-as-root --oversubscribe -n {n} python /app/wordFreqMPI.py'
-            out_mpi = run_command(cmd_mpi)
-            time_mpi = extract_time(out_mpi)
-            
-            if time_mpi is None:
-                print(f"  [WARN] Could not extract time from MPI output.")
-            
-            results[count]["MPI"][n] = time_mpi
-            print(f"  -> MPI ({n}) Time: {time_mpi} s")
-            
-            csv_rows.append({
-                "Files": count,
-                "Type": "MPI",
-                "Workers": n,
-                "Time": time_mpi
-            })
+            # 3. Run MPI (one run per communication strategy)
+            for strategy, label in mpi_strategies.items():
+                print(f"Running {label} with {n} processes...")
+                if args.servicio:
+                    times_mpi, startup_mpi = run_service_job(label, n, warmup, trials)
+                else:
+                    # --oversubscribe is crucial for running more processes than physical cores
+                    cmd_mpi = f'docker run --rm -v "{target_dir}:/app" augustosalazar/slim-mpi mpiexec --allow-run-as-root --oversubscribe -n {n} python /app/wordFreqMPI.py --estrategia {strategy}'
+                    times_mpi, startup_mpi = measure(cmd_mpi, warmup, trials), None
+                stats_mpi = summarize(times_mpi)
+                time_mpi = stats_mpi["Median"]
+                
+                if time_mpi is None:
+                    print(f"  [WARN] No successful {label} runs.")
+                
+                results[count][label][n] = time_mpi
+                print(f"  -> {label} ({n}) Time: {time_mpi} s (p95 {stats_mpi['P95']} s, {stats_mpi['Runs']} runs)"
+                      + (f" (pool start-up: {startup_mpi} s)" if startup_mpi else ""))
+                
+                csv_rows.append({
+                    "Files": count,
+                    "Type": label,
+                    "Workers": n,
+                    "Time": time_mpi,
+                    "Startup": startup_mpi,
+                    **stats_mpi
+                })
 
             # 4. Run Dask
-            print(f"Running Dask with {n} workers...")
-            cmd_dask = f'docker run --rm -v "{target_dir}:/app" --network host daskdev/dask:latest python /app/wordFreqDask.py {n}'
-            out_dask = run_command(cmd_dask)
-            time_dask = extract_time(out_dask)
+            print(f"Running {dask_label} with {n} workers...")
+            if args.servicio:
+                times_dask, startup_dask = run_service_job(dask_label, n, warmup, trials)
+            else:
+                cmd_dask = f'docker run --rm -v "{target_dir}:/app" --network host daskdev/dask:latest python /app/wordFreqDask.py {n}'
+                times_dask, startup_dask = measure(cmd_dask, warmup, trials), None
+            stats_dask = summarize(times_dask)
+            time_dask = stats_dask["Median"]
             
             if time_dask is None:
-                print(f"  [WARN] Could not extract time from Dask output.")
+                print(f"  [WARN] No successful {dask_label} runs.")
             
-            results[count]["Dask"][n] = time_dask
-            print(f"  -> Dask ({n}) Time: {time_dask} s")
+            results[count][dask_label][n] = time_dask
+            print(f"  -> {dask_label} ({n}) Time: {time_dask} s (p95 {stats_dask['P95']} s, {stats_dask['Runs']} runs)"
+                  + (f" (pool start-up: {startup_dask} s)" if startup_dask else ""))
             
             csv_rows.append({
                 "Files": count,
-                "Type": "Dask",
+                "Type": dask_label,
                 "Workers": n,
-                "Time": time_dask
+                "Time": time_dask,
+                "Startup": startup_dask,
+                **stats_dask
             })
 
+    stop_services(services)
+
     # --- Print Summary Table ---
     print("\n\n" + "="*120)
     print("BENCHMARK RESULTS SUMMARY")
@@ -169,10 +277,11 @@ def main():
     
     # Header
     header = f"{'Files':<8} | {'Sequential':<12}"
+    for label in mpi_strategies.values():
+        for n in worker_counts:
+            header += f" | {label+' ('+str(n)+')':<12}"
     for n in worker_counts:
-        header += f" | {'MPI ('+str(n)+')':<10}"
-    for n in worker_counts:
-        header += f" | {'Dask ('+str(n)+')':<10}"
+        header += f" | {dask_label+' ('+str(n)+')':<10}"
     print(header)
     print("-" * len(header))
 
@@ -185,14 +294,15 @@ def main():
         row += f"{t_seq:.3f} s      " if t_seq is not None else "Fail        "
         
         # MPI
-        for n in worker_counts:
-            t = results[count]["MPI"].get(n)
-            val = f"{t:.3f} s" if t is not None else "Fail"
-            row += f" | {val:<10}"
+        for label in mpi_strategies.values():
+            for n in worker_counts:
+                t = results[count][label].get(n)
+                val = f"{t:.3f} s" if t is not None else "Fail"
+                row += f" | {val:<12}"
             
         # Dask
         for n in worker_counts:
-            t = results[count]["Dask"].get(n)
+            t = results[count][dask_label].get(n)
             val = f"{t:.3f} s" if t is not None else "Fail"
             row += f" | {val:<10}"
             
@@ -200,16 +310,126 @@ def main():
     print("="*120)
     
     # --- Write CSV ---
-    csv_file = os.path.join(target_dir, "benchmark_results.csv")
-    print(f"\nWriting results to {csv_file}...")
-    try:
-        with open(csv_file, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=["Files", "Type", "Workers", "Time"])
-            writer.writeheader()
-            writer.writerows(csv_rows)
-        print("CSV write successful.")
-    except Exception as e:
-        print(f"Error writing CSV: {e}")
+    csv_name = "benchmark_results_servicio.csv" if args.servicio else "benchmark_results.csv"
+    write_csv(os.path.join(target_dir, csv_name),
+              ["Files", "Type", "Workers", "Time", "Startup", "Median", "P95", "Mean", "Std", "Min", "Runs"],
+              csv_rows)
+
+def suite_primos(args, target_dir):
+    """Prime checkers swept over digits x workers x batch size (benchmark_primos.csv)."""
+    warmup, trials = args.calentamiento, args.repeticiones
+    worker_counts = [1, 2, 4, 8]
+    metodo = args.metodo
+    csv_rows = []
+    # Primes found per digit count, to check that every implementation agrees
+    counts = {}
+
+    print("Starting Prime Benchmark...")
+    for digits in args.digitos:
+        for batch in args.batches:
+            print(f"\n" + "="*40)
+            print(f" {digits} digits, batch {batch} ({metodo}) ")
+            print("="*40)
+            options = f"{digits} --metodo {metodo} --batch {batch}"
+            runs = [("Sequential", 1, f"python target/primeChecker.py {options}")]
+            for n in worker_counts:
+                runs.append(("MPI", n, f'docker run --rm -v "{target_dir}:/app" augustosalazar/slim-mpi mpiexec --allow-run-as-root --oversubscribe -n {n} python /app/primeCheckerMPI.py {options}'))
+                runs.append(("Dask", n, f'docker run --rm -v "{target_dir}:/app" --network host daskdev/dask:latest python /app/primeCheckerDask.py {digits} {n} --metodo {metodo} --batch {batch}'))
+
+            for label, n, command in runs:
+                print(f"Running {label} with {n} workers...")
+                records = run_trials(command, warmup, trials)
+                stats = summarize([record["tiempo"] for record in records])
+                for found in {record["resultado"]["primos"] for record in records}:
+                    if counts.setdefault(digits, found) != found:
+                        print(f"  [WARN] {label} ({n}) found {found} primes, expected {counts[digits]}")
+                print(f"  -> {label} ({n}) Time: {stats['Median']} s (p95 {stats['P95']} s, {stats['Runs']} runs)")
+                csv_rows.append({"Digits": digits, "Batch": batch, "Method": metodo, "Type": label, "Workers": n,
+                                 "Time": stats["Median"], "Primes": counts.get(digits), **stats})
+
+    write_csv(os.path.join(target_dir, "benchmark_primos.csv"),
+              ["Digits", "Batch", "Method", "Type", "Workers", "Time", "Primes",
+               "Median", "P95", "Mean", "Std", "Min", "Runs"], csv_rows)
+
+def suite_pingpong(args, target_dir):
+    """Ping-pong latency, bandwidth and eager/rendezvous crossover of the MPI send modes (benchmark_pingpong.csv)."""
+    print("Starting Ping-Pong Benchmark...")
+    command = f'docker run --rm -v "{target_dir}:/app" augustosalazar/slim-mpi mpiexec --allow-run-as-root --oversubscribe -n 2 python /app/pingpong.py --max {args.max_bytes}'
+    records = run_trials(command, args.calentamiento, args.repeticiones)
+    if not records:
+        print("  [WARN] No successful ping-pong runs.")
+        return
+
+    # Latencies and probe results of every trial, by (mode, message size)
+    latencies, probes = {}, {}
+    for record in records:
+        delay = record["configuracion"]["retraso"]
+        for m in record["resultado"]["mediciones"]:
+            key = (m["modo"], m["bytes"])
+            latencies.setdefault(key, []).append(m["latencia"])
+            if m["envio_sonda"] is not None:
+                probes.setdefault(key, []).append(m["envio_sonda"] >= delay / 2)
+
+    csv_rows = []
+    crossover = {}
+    print(f"\n{'Mode':>6} | {'Bytes':>10} | {'Latency (us)':>12} | {'P95 (us)':>10} | {'MB/s':>10} | Protocol")
+    for (mode, size), times in sorted(latencies.items(), key=lambda item: (item[0][1], item[0][0])):
+        stats = summarize(times)
+        waits = probes.get((mode, size))
+        # A size is rendezvous when the send waited for the receiver in most trials
+        protocol = "" if waits is None else ("rendezvous" if 2 * sum(waits) > len(waits) else "eager")
+        if protocol == "rendezvous":
+            crossover.setdefault(mode, size)
+        bandwidth = size / stats["Median"] / 1e6
+        print(f"{mode:>6} | {size:>10} | {stats['Median'] * 1e6:>12.2f} | {stats['P95'] * 1e6:>10.2f} | "
+              f"{bandwidth:>10.1f} | {protocol}")
+        csv_rows.append({"Mode": mode, "Bytes": size, "Latency": stats["Median"], "Bandwidth_MBs": bandwidth,
+                         "Protocol": protocol, **stats})
+
+    print("\nEager -> rendezvous crossover (first size whose send waits for the receiver):")
+    for mode in sorted({mode for mode, _ in probes}):
+        print(f"  {mode:>5}: {crossover.get(mode, 'not reached')}")
+
+    write_csv(os.path.join(target_dir, "benchmark_pingpong.csv"),
+              ["Mode", "Bytes", "Latency", "Bandwidth_MBs", "Protocol", "Median", "P95", "Mean", "Std", "Min", "Runs"],
+              csv_rows)
+
+# Benchmark suites selectable with --suite
+SUITES = {"wordfreq": suite_wordfreq, "primos": suite_primos, "pingpong": suite_pingpong}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suites for the MPI and Dask examples.")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="wordfreq",
+                        help="wordfreq: word frequency implementations (default); primos: prime checkers "
+                             "over digits x workers x batch; pingpong: MPI send modes latency and bandwidth")
+    parser.add_argument("--servicio", action="store_true",
+                        help="run MPI and Dask jobs on warm persistent services (servicio.py) instead of a "
+                             "fresh container and cluster per measurement; pool start-up is reported apart "
+                             "(wordfreq suite)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="measured trials per cell")
+    parser.add_argument("--calentamiento", type=int, default=1, help="warm-up runs per cell (not recorded)")
+    parser.add_argument("--semilla", type=int, default=None,
+                        help="corpus seed, to reproduce the generated files exactly (wordfreq suite)")
+    parser.add_argument("--digitos", type=int, nargs="+", default=[6, 7, 8], help="digit counts (primos suite)")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="batch sizes (primos suite)")
+    parser.add_argument("--metodo", choices=["criba", "division", "vectorizado", "miller-rabin"],
+                        default="vectorizado", help="prime counting method (primos suite)")
+    parser.add_argument("--max-bytes", type=int, default=256 * 2 ** 20,
+                        help="largest message size in bytes (pingpong suite)")
+    args = parser.parse_args()
+
+    # --- Paths ---
+    # We assume the script is run from the root MPI directory
+    current_dir = os.getcwd() 
+    target_dir = os.path.join(current_dir, "target")
+    
+    # Check if we are in the right place
+    if not os.path.exists(target_dir):
+        print("Error: 'target' directory not found. Please run from the root 'MPI' directory.")
+        return
+
+    SUITES[args.suite](args, target_dir)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import struct
+from array import array
+from collections import Counter
+
+from lectura import iterar_bloques
+
+# Formato binario de cada entrada:
+#   MAGICO | n_palabras (uint64) | bytes_palabras (uint64)
+#   | palabras unidas por b"\n" | n_palabras cuentas int64
+# Las palabras nunca contienen espacios, así que b"\n" es un separador seguro.
+MAGICO = b"TKC1"
+CABECERA = struct.Struct("<4sQQ")
+EXTENSION = ".tkc"
+
+LIMITE_CACHE = 512 * 1024 * 1024
+
+
+def clave(trozo, case_sensitive=False, por_contenido=False) -> str:
+    """
+    Clave de la entrada de un trozo (ruta, inicio, fin). Por defecto se usa
+    (ruta, tamaño, mtime); con por_contenido se usa un hash de los bytes.
+    """
+    ruta, inicio, fin = trozo
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{inicio}:{fin}:{int(case_sensitive)}|".encode())
+    if por_contenido:
+        with open(ruta, "rb") as f:
+            f.seek(inicio)
+            restante = fin - inicio
+            while restante > 0:
+                datos = f.read(min(1024 * 1024, restante))
+                if not datos:
+                    break
+                h.update(datos)
+                restante -= len(datos)
+    else:
+        st = os.stat(ruta)
+        h.update(f"{os.path.abspath(ruta)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def guardar(dir_cache, k, conteo):
+    """Escribe el histograma {palabra (bytes): cuenta} de forma atómica."""
+    os.makedirs(dir_cache, exist_ok=True)
+    palabras = b"\n".join(conteo.keys())
+    cuentas = array("q", conteo.values())
+    ruta = os.path.join(dir_cache, k + EXTENSION)
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(CABECERA.pack(MAGICO, len(cuentas), len(palabras)))
+        f.write(palabras)
+        cuentas.tofile(f)
+    os.replace(tmp, ruta)
+
+
+def cargar(dir_cache, k):
+    """Devuelve el histograma guardado con la clave k, o None si no existe o está dañado."""
+    ruta = os.path.join(dir_cache, k + EXTENSION)
+    try:
+        with open(ruta, "rb") as f:
+            magico, n, n_bytes = CABECERA.unpack(f.read(CABECERA.size))
+            if magico != MAGICO:
+                return None
+            palabras = f.read(n_bytes).split(b"\n") if n else []
+            cuentas = array("q")
+            cuentas.fromfile(f, n)
+    except (OSError, EOFError, struct.error):
+        return None
+    # Marcar la entrada como usada recientemente (LRU por mtime)
+    os.utime(ruta)
+    return Counter(dict(zip(palabras, cuentas)))
+
+
+def desalojar(dir_cache, limite=LIMITE_CACHE):
+    """Borra las entradas menos usadas hasta que la caché ocupe como mucho `limite` bytes."""
+    if not os.path.isdir(dir_cache):
+        return
+    entradas = []
+    for nombre in os.listdir(dir_cache):
+        if nombre.endswith(EXTENSION):
+            st = os.stat(os.path.join(dir_cache, nombre))
+            entradas.append((st.st_mtime, st.st_size, nombre))
+    total = sum(e[1] for e in entradas)
+    for _, tamaño, nombre in sorted(entradas):
+        if total <= limite:
+            break
+        try:
+            os.remove(os.path.join(dir_cache, nombre))
+        except OSError:
+            continue
+        total -= tamaño
+
+
+def histograma_trozo(trozo, dir_cache, case_sensitive=False, por_contenido=False, iterar=iterar_bloques):
+    """
+    Histograma completo {palabra (bytes): cuenta} de un trozo. Si está en la
+    caché se evita la lectura y la tokenización; si no, se calcula y se guarda.
+    """
+    k = clave(trozo, case_sensitive, por_contenido)
+    conteo = cargar(dir_cache, k)
+    if conteo is None:
+        conteo = Counter()
+        for bloque in iterar(trozo, case_sensitive):
+            conteo.update(bloque.split())
+        guardar(dir_cache, k, conteo)
+    return conteo
+
+
+def filtrar(conteo, palabras_buscar):
+    """Restringe un histograma de bytes a un vocabulario de str; devuelve un Counter de str."""
+    resultado = Counter()
+    for palabra, cuenta in conteo.items():
+        p = palabra.decode("utf-8")
+        if p in palabras_buscar:
+            resultado[p] += cuenta
+    return resultado
+
+
+def agregar_opciones(parser):
+    """Opciones de línea de comandos comunes a los tres programas de frecuencia de palabras."""
+    parser.add_argument("--cache", metavar="DIR", default=None,
+                        help="directorio de la caché persistente de histogramas por archivo (desactivada si se omite)")
+    parser.add_argument("--cache-mb", type=float, default=LIMITE_CACHE / 2**20,
+                        help="tamaño máximo de la caché en MB; se desalojan las entradas menos usadas")
+    parser.add_argument("--cache-hash", action="store_true",
+                        help="usar un hash del contenido como clave en lugar de (ruta, tamaño, mtime)")
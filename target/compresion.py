@@ -0,0 +1,206 @@
+import argparse
+import bz2
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Corpus comprimido: los lectores aceptan file_XX.txt.gz, .bz2, .zst y .lz4
+# (zstd y lz4 requieren los paquetes zstandard y lz4). Un archivo puede ser
+# una sucesión de marcos independientes (miembros gzip, flujos bz2, marcos
+# zstd o lz4); si junto a él hay un índice <archivo>.idx con el final de cada
+# marco y los marcos terminan en un espacio, el archivo se puede dividir en
+# trozos entre marcos y descomprimir en paralelo, como un archivo de texto.
+FORMATOS = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd", ".lz4": "lz4"}
+EXTENSIONES = {fmt: ext for ext, fmt in FORMATOS.items()}
+SUFIJO_INDICE = ".idx"
+
+# Bytes sin comprimir por marco al comprimir con comprimir()
+TAMAÑO_MARCO = 4 * 1024 * 1024
+# Bytes comprimidos que se leen del disco por llamada al descompresor
+TAMAÑO_LECTURA = 1024 * 1024
+
+# Segundos pasados en el descompresor por este proceso (ver tiempo_descompresion)
+_tiempo = 0.0
+
+
+def formato(ruta):
+    """Formato de compresión según la extensión ('gzip', 'bz2', 'zstd', 'lz4'), o None."""
+    return FORMATOS.get(os.path.splitext(ruta)[1].lower())
+
+
+def nombre_base(nombre):
+    """Nombre sin la extensión de compresión (file_02.txt.gz -> file_02.txt)."""
+    raiz, ext = os.path.splitext(nombre)
+    return raiz if ext.lower() in FORMATOS else nombre
+
+
+def es_texto(nombre):
+    """¿Es un archivo del corpus (.txt, comprimido o no)?"""
+    return nombre_base(nombre).lower().endswith(".txt")
+
+
+def buscar(directorio, nombre):
+    """Ruta de nombre en directorio o, si no existe, de su versión comprimida."""
+    ruta = os.path.join(directorio, nombre)
+    if not os.path.exists(ruta):
+        for ext in FORMATOS:
+            if os.path.exists(ruta + ext):
+                return ruta + ext
+    return ruta
+
+
+def _modulo(fmt):
+    if fmt == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("Para leer o escribir archivos .zst hace falta el paquete zstandard.") from e
+        return zstandard
+    try:
+        import lz4.frame
+    except ImportError as e:
+        raise RuntimeError("Para leer o escribir archivos .lz4 hace falta el paquete lz4.") from e
+    return lz4.frame
+
+
+def nuevo_descompresor(fmt):
+    """Descompresor incremental de un marco, con decompress(), eof y unused_data."""
+    if fmt == "gzip":
+        return zlib.decompressobj(wbits=31)
+    if fmt == "bz2":
+        return bz2.BZ2Decompressor()
+    if fmt == "zstd":
+        return _modulo(fmt).ZstdDecompressor().decompressobj()
+    return _modulo(fmt).LZ4FrameDecompressor()
+
+
+def comprimir_marco(datos, fmt, nivel=None):
+    """Comprime datos como un marco independiente (se pueden concatenar)."""
+    if fmt == "gzip":
+        return zlib.compress(datos, 6 if nivel is None else nivel, wbits=31)
+    if fmt == "bz2":
+        return bz2.compress(datos, 9 if nivel is None else nivel)
+    if fmt == "zstd":
+        return _modulo(fmt).ZstdCompressor(level=3 if nivel is None else nivel).compress(datos)
+    return _modulo(fmt).compress(datos, compression_level=0 if nivel is None else nivel)
+
+
+def descomprimir(f, fmt, restante, tamaño_lectura=TAMAÑO_LECTURA):
+    """
+    Genera los bytes descomprimidos de los siguientes `restante` bytes de f,
+    que deben ser uno o varios marcos completos. Solo el tiempo dentro del
+    descompresor (no la lectura del disco) se suma a tiempo_descompresion().
+    """
+    global _tiempo
+    d = nuevo_descompresor(fmt)
+    while restante > 0:
+        datos = f.read(min(tamaño_lectura, restante))
+        if not datos:
+            break
+        restante -= len(datos)
+        t0 = time.perf_counter()
+        partes = []
+        while datos:
+            partes.append(d.decompress(datos))
+            if not d.eof:
+                break
+            # Fin de un marco: lo que sobra es el comienzo del siguiente
+            datos = d.unused_data
+            d = nuevo_descompresor(fmt)
+        _tiempo += time.perf_counter() - t0
+        texto = b"".join(partes)
+        if texto:
+            yield texto
+
+
+def leer(ruta):
+    """Contenido completo de un archivo, descomprimido si hace falta."""
+    fmt = formato(ruta)
+    with open(ruta, "rb") as f:
+        if fmt is None:
+            return f.read()
+        return b"".join(descomprimir(f, fmt, os.path.getsize(ruta)))
+
+
+def tiempo_descompresion():
+    return _tiempo
+
+
+def reiniciar_tiempo():
+    global _tiempo
+    _tiempo = 0.0
+
+
+def marcos(ruta):
+    """
+    Final (desplazamiento comprimido) de cada marco según el índice del
+    archivo, o None si no hay índice o no corresponde al archivo.
+    """
+    try:
+        with open(ruta + SUFIJO_INDICE, "r", encoding="utf-8") as f:
+            limites = [int(linea) for linea in f if linea.strip()]
+    except (OSError, ValueError):
+        return None
+    if not limites or limites[-1] != os.path.getsize(ruta):
+        return None
+    return limites
+
+
+def comprimir(ruta, fmt, tamaño_marco=TAMAÑO_MARCO, nivel=None, borrar=False):
+    """
+    Comprime ruta en ruta + extensión como marcos de unos tamaño_marco bytes
+    que terminan en un espacio, y escribe el índice de marcos. Devuelve
+    (ruta del archivo comprimido, cantidad de marcos).
+    """
+    from lectura import ultimo_espacio
+
+    destino = ruta + EXTENSIONES[fmt]
+    limites = []
+    with open(ruta, "rb") as f_in, open(destino, "wb") as f_out:
+        resto = b""
+        while True:
+            nuevos = f_in.read(tamaño_marco)
+            datos = resto + nuevos
+            if not datos:
+                break
+            if len(nuevos) == tamaño_marco:
+                # La palabra partida al final pasa al marco siguiente
+                corte = ultimo_espacio(datos)
+                if corte < 0:
+                    resto = datos
+                    continue
+            else:
+                corte = len(datos) - 1
+            resto = datos[corte + 1:]
+            f_out.write(comprimir_marco(datos[:corte + 1], fmt, nivel))
+            limites.append(f_out.tell())
+    with open(destino + SUFIJO_INDICE, "w", encoding="utf-8") as f:
+        f.writelines(f"{fin}\n" for fin in limites)
+    if borrar:
+        os.remove(ruta)
+    return destino, len(limites)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprime archivos del corpus en marcos independientes con índice.")
+    parser.add_argument("formato", choices=sorted(EXTENSIONES))
+    parser.add_argument("archivos", nargs="+")
+    parser.add_argument("--marco-mb", type=float, default=TAMAÑO_MARCO / 2**20,
+                        help="megabytes sin comprimir por marco (unidad mínima de reparto)")
+    parser.add_argument("--nivel", type=int, default=None, help="nivel de compresión del formato")
+    parser.add_argument("--borrar", action="store_true", help="elimina los archivos originales")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool (por defecto, uno por CPU)")
+    args = parser.parse_args()
+
+    tamaño_marco = int(args.marco_mb * 2**20)
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        futuros = [pool.submit(comprimir, ruta, args.formato, tamaño_marco, args.nivel, args.borrar)
+                   for ruta in args.archivos]
+        for ruta, futuro in zip(args.archivos, futuros):
+            destino, n_marcos = futuro.result()
+            print(f"{ruta} -> {destino} ({os.path.getsize(destino) / 2**20:.2f} MB, {n_marcos} marcos)")
+
+
+if __name__ == "__main__":
+    main()
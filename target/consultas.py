@@ -0,0 +1,75 @@
+import os
+from collections import Counter
+
+import compresion
+
+# Varias consultas en una sola pasada: cada consulta es un archivo de
+# referencia (como file_01.txt). Se construye un índice palabra -> consultas
+# que la contienen; sus claves (la unión de los vocabularios) son lo único que
+# se cuenta al recorrer el corpus, y al final el conteo global se reparte por
+# consulta con el índice. La lectura y la tokenización se pagan una vez por
+# corpus y no una vez por consulta.
+
+
+def cargar(directorio, nombres, case_sensitive=False):
+    """Lista de (nombre, vocabulario) de las consultas; las rutas relativas se buscan en directorio."""
+    consultas = []
+    for nombre in nombres:
+        palabras = compresion.leer(compresion.buscar(directorio, nombre)).decode("utf-8").split()
+        if not case_sensitive:
+            palabras = [p.lower() for p in palabras]
+        consultas.append((nombre, set(palabras)))
+    return consultas
+
+
+def excluidos(consultas, directorio):
+    """
+    Nombres base de las consultas que están en el directorio del corpus (y
+    por eso no se cuentan como parte de él). Una consulta de otra carpeta con
+    el mismo nombre que un archivo del corpus no lo excluye.
+    """
+    carpeta = os.path.realpath(directorio)
+    nombres = set()
+    for nombre, _ in consultas:
+        ruta = os.path.realpath(compresion.buscar(directorio, nombre))
+        if os.path.dirname(ruta) == carpeta:
+            nombres.add(compresion.nombre_base(os.path.basename(ruta)))
+    return nombres
+
+
+def construir_indice(consultas):
+    """Índice {palabra: [posiciones de las consultas que la contienen]}."""
+    indice = {}
+    for i, (_, palabras) in enumerate(consultas):
+        for palabra in palabras:
+            indice.setdefault(palabra, []).append(i)
+    return indice
+
+
+def repartir(conteo, consultas, indice, n):
+    """Top n de cada consulta a partir del conteo global de la unión: {nombre: [(palabra, cuenta)]}."""
+    por_consulta = [Counter() for _ in consultas]
+    for palabra, cuenta in conteo.items():
+        for i in indice.get(palabra, ()):
+            por_consulta[i][palabra] = cuenta
+    return {nombre: c.most_common(n) for (nombre, _), c in zip(consultas, por_consulta)}
+
+
+def repartir_aproximado(sketch, consultas, n):
+    """Top n aproximado de cada consulta a partir de un aproximado.CountMin."""
+    return {nombre: sketch.top(palabras, n) for nombre, palabras in consultas}
+
+
+def imprimir(resultados, n):
+    for nombre, top in resultados.items():
+        print(f"Top {n} palabras de {nombre} en el corpus:")
+        for palabra, cuenta in top:
+            print(f"  {palabra}: {cuenta}")
+        print()
+
+
+def agregar_opciones(parser):
+    """Opción --consultas común a los programas de frecuencia de palabras."""
+    parser.add_argument("--consultas", nargs="+", metavar="ARCHIVO", default=None,
+                        help="varios archivos de referencia respondidos en una sola pasada por el corpus (en "
+                             "lugar de file_01.txt); los que estén en el directorio del corpus no se cuentan")
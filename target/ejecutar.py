@@ -0,0 +1,94 @@
+import argparse
+import itertools
+import os
+import time
+from collections import Counter
+
+import compresion
+import ejecutores
+import salida
+from lectura import contar_palabras_trozos
+from particion import particionar
+from primos import primos_base, limite_base, contar_primos_lote, dividir_rango
+
+# Cargas de trabajo escritas una sola vez sobre la capa de ejecutores: el
+# mismo código corre en serie, con hilos, procesos, MPIPoolExecutor o Dask.
+
+TAREAS_POR_WORKER = 4
+
+DIRECTORIO = "/app" if os.path.exists("/app") else os.path.dirname(os.path.abspath(__file__))
+
+
+def trabajo_wordfreq(ejecutor, n, peticion):
+    """Top N de palabras de file_01.txt en el resto de archivos .txt del directorio."""
+    directorio = peticion.get("directorio") or DIRECTORIO
+    ref = "file_01.txt"
+    vocab = set(compresion.leer(compresion.buscar(directorio, ref)).decode("utf-8").lower().split())
+    archivos = [os.path.join(directorio, a) for a in sorted(os.listdir(directorio))
+                if compresion.es_texto(a) and compresion.nombre_base(a) != ref]
+    grupos = [g for g in particionar(archivos, TAREAS_POR_WORKER * n) if g]
+    total = Counter()
+    # El vocabulario se envía una vez a los workers; las tareas llevan solo los trozos
+    with ejecutores.difundir(ejecutor, vocab) as vocab_ref:
+        for parcial in ejecutores.mapear(ejecutor, contar_palabras_trozos, grupos, itertools.repeat(vocab_ref),
+                                         tamaño_trozo=peticion.get("trozo", 1), workers=n):
+            total.update(parcial)
+    return {"archivos": len(archivos), "top": total.most_common(peticion.get("top", 5))}
+
+
+def trabajo_primos(ejecutor, n, peticion):
+    """Cantidad de primos con el número de dígitos pedido."""
+    digitos = peticion["digitos"]
+    metodo = peticion.get("metodo", "criba")
+    inicio, fin = 10 ** (digitos - 1), 10 ** digitos
+    base = primos_base(limite_base(fin)) if metodo in ("criba", "vectorizado") else None
+    lotes = dividir_rango(inicio, fin, peticion.get("lotes", TAREAS_POR_WORKER * n))
+    total = sum(ejecutores.mapear(ejecutor, contar_primos_lote, lotes, itertools.repeat(metodo),
+                                  itertools.repeat(base), tamaño_trozo=peticion.get("trozo", 1), workers=n))
+    return {"primos": total}
+
+
+TRABAJOS = {"wordfreq": trabajo_wordfreq, "primos": trabajo_primos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta una carga de trabajo con el backend elegido.")
+    ejecutores.agregar_opciones(parser)
+    salida.agregar_opciones(parser)
+    sub = parser.add_subparsers(dest="trabajo", required=True)
+    p_primos = sub.add_parser("primos", help="cuenta los primos de N dígitos")
+    p_primos.add_argument("digitos", type=int)
+    p_primos.add_argument("--metodo", choices=["criba", "division", "vectorizado", "miller-rabin"], default="criba")
+    p_primos.add_argument("--lotes", type=int, default=None,
+                          help=f"cantidad de lotes del rango (por defecto {TAREAS_POR_WORKER} por worker)")
+    p_wordfreq = sub.add_parser("wordfreq", help="top de palabras de file_01.txt en el resto de archivos")
+    p_wordfreq.add_argument("--directorio", default=None)
+    p_wordfreq.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    peticion = {k: v for k, v in vars(args).items() if v is not None}
+    t0 = time.perf_counter()
+    ejecutor, cerrar = ejecutores.crear(args.backend, args.workers)
+    t1 = time.perf_counter()
+    try:
+        resultado = TRABAJOS[args.trabajo](ejecutor, args.workers, peticion)
+    finally:
+        t2 = time.perf_counter()
+        cerrar()
+
+    if args.json:
+        salida.emitir_json("ejecutar", t2 - t1, resultado, args, workers=args.workers, arranque=t1 - t0)
+        return
+    print(f"Backend: {args.backend} ({args.workers} workers)")
+    print(f"Arranque del pool: {t1 - t0:.3f} segundos")
+    print(f"Tiempo de ejecución: {t2 - t1:.3f} segundos")
+    if "top" in resultado:
+        print(f"\nTop {len(resultado['top'])} palabras de file_01.txt en otros archivos:")
+        for palabra, cuenta in resultado["top"]:
+            print(f"  {palabra}: {cuenta}")
+    else:
+        print(f"Total de primos con {args.digitos} dígitos: {resultado['primos']}")
+
+
+if __name__ == "__main__":
+    main()
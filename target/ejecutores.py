@@ -0,0 +1,213 @@
+import concurrent.futures
+import contextlib
+import os
+import pickle
+import tempfile
+import uuid
+from collections import deque
+
+# Capa de ejecución común con la interfaz de concurrent.futures: los núcleos
+# (contar_primos_lote, contar_palabras_trozos) se escriben una vez y se
+# despachan con cualquiera de estos backends.
+BACKENDS = ("serial", "hilos", "procesos", "mpi", "dask")
+
+# Tareas en vuelo por worker antes de esperar resultados (contrapresión)
+PENDIENTES_POR_WORKER = 2
+
+# Valor de difundir() cargado por este proceso worker: (clave, valor)
+_compartido = (None, None)
+
+
+class EjecutorSerial(concurrent.futures.Executor):
+    """Ejecuta cada tarea en el propio proceso al enviarla (línea base sin paralelismo)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        futuro = concurrent.futures.Future()
+        try:
+            futuro.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            futuro.set_exception(e)
+        return futuro
+
+
+class EjecutorMPI(concurrent.futures.Executor):
+    """
+    MPIPoolExecutor con sus `workers` workers ya arrancados (se lanzan con
+    MPI.Comm.Spawn: ejecutar con mpiexec -n 1). Recuerda cuántos son, que
+    difundir() necesita para su broadcast.
+    """
+
+    def __init__(self, workers):
+        from mpi4py.futures import MPIPoolExecutor
+        self.workers = workers
+        self.pool = MPIPoolExecutor(max_workers=workers)
+        self.pool.bootup(wait=True)
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self.pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+class EjecutorDask(concurrent.futures.Executor):
+    """Ejecutor de un Client de Dask que conserva el cliente (difundir() hace scatter con él)."""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.ejecutor = cliente.get_executor()
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self.ejecutor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.ejecutor.shutdown(wait=wait)
+
+
+def crear(backend, workers):
+    """
+    Crea el ejecutor del backend indicado con `workers` workers. Devuelve
+    (ejecutor, cerrar), donde cerrar() libera el pool o el cluster.
+    """
+    if backend == "serial":
+        ejecutor = EjecutorSerial()
+        return ejecutor, ejecutor.shutdown
+    if backend == "hilos":
+        # Útil con los núcleos de NumPy, que liberan el GIL en sus bucles
+        ejecutor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        return ejecutor, ejecutor.shutdown
+    if backend == "procesos":
+        ejecutor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        return ejecutor, ejecutor.shutdown
+    if backend == "mpi":
+        ejecutor = EjecutorMPI(workers)
+        return ejecutor, ejecutor.shutdown
+    if backend == "dask":
+        from dask.distributed import Client, LocalCluster
+        cluster = LocalCluster(n_workers=workers, threads_per_worker=1, processes=True)
+        client = Client(cluster)
+        client.wait_for_workers(workers)
+
+        def cerrar():
+            client.close()
+            cluster.close()
+        return EjecutorDask(client), cerrar
+    raise ValueError(f"backend desconocido: {backend}")
+
+
+class Compartido:
+    """
+    Referencia a un valor difundido: en cada tarea viajan solo la clave
+    (uuid4, distinta en cada difusión aunque el pool se reutilice entre
+    trabajos) y, con procesos, la ruta del archivo del que se carga.
+    """
+
+    def __init__(self, clave, ruta=None):
+        self.clave = clave
+        self.ruta = ruta
+
+
+def _recibir_mpi(clave, valor, origen):
+    """Tarea de difundir() en cada worker MPI: el que recibió el valor lo reparte a los demás."""
+    global _compartido
+    from mpi4py import MPI
+    from mpi4py.futures import get_comm_workers
+
+    comm = get_comm_workers()
+    raiz = comm.allreduce(comm.Get_rank() if origen else -1, op=MPI.MAX)
+    _compartido = (clave, comm.bcast(valor, root=raiz))
+
+
+@contextlib.contextmanager
+def difundir(ejecutor, valor):
+    """
+    Envía valor una sola vez a los workers del ejecutor y entrega una
+    referencia para pasar en las tareas en su lugar (mapear la resuelve antes
+    de llamar a la función). Sirve también con pools que se reutilizan entre
+    trabajos, como los de servicio.py.
+
+    - serial o hilos: la referencia es el propio valor.
+    - dask: scatter a todos los workers.
+    - mpi: una tarea por worker; la única que lleva el valor lo reparte con
+      un bcast por el comunicador de los workers, así que no hace falta que
+      compartan sistema de archivos. El pool no debe tener otras tareas en
+      vuelo: cada worker tiene que tomar exactamente una de estas.
+    - procesos: el valor se escribe en un archivo temporal que cada worker
+      carga la primera vez que lo necesita (los procesos de un
+      ProcessPoolExecutor están siempre en la misma máquina).
+    """
+    if isinstance(ejecutor, (EjecutorSerial, concurrent.futures.ThreadPoolExecutor)):
+        yield valor
+        return
+    if isinstance(ejecutor, EjecutorDask):
+        # La lista evita que scatter reparta los elementos de un set o dict por separado
+        [futuro] = ejecutor.cliente.scatter([valor], broadcast=True, hash=False)
+        try:
+            yield futuro
+        finally:
+            futuro.release()
+        return
+    clave = uuid.uuid4().hex
+    if isinstance(ejecutor, EjecutorMPI):
+        tareas = [ejecutor.submit(_recibir_mpi, clave, valor if i == 0 else None, i == 0)
+                  for i in range(ejecutor.workers)]
+        for tarea in tareas:
+            tarea.result()
+        yield Compartido(clave)
+        return
+    fd, ruta = tempfile.mkstemp(prefix="compartido-", suffix=".pkl")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        yield Compartido(clave, ruta)
+    finally:
+        os.remove(ruta)
+
+
+def obtener(valor):
+    """Valor de una referencia de difundir() en el worker (otros argumentos pasan tal cual)."""
+    global _compartido
+    if not isinstance(valor, Compartido):
+        return valor
+    if _compartido[0] != valor.clave:
+        if valor.ruta is None:
+            raise RuntimeError("Este worker no recibió el valor difundido (¿se reemplazó el pool?).")
+        with open(valor.ruta, "rb") as f:
+            _compartido = (valor.clave, pickle.load(f))
+    return _compartido[1]
+
+
+def aplicar_trozo(funcion, argumentos):
+    """Aplica funcion a una lista de tuplas de argumentos dentro de una sola tarea."""
+    return [funcion(*map(obtener, args)) for args in argumentos]
+
+
+def mapear(ejecutor, funcion, *iterables, tamaño_trozo=1, pendientes_max=None, workers=None):
+    """
+    Como Executor.map (resultados en orden), pero agrupando tamaño_trozo
+    elementos por tarea y con a lo sumo pendientes_max tareas en vuelo: los
+    iterables se consumen a medida que terminan tareas, así que pueden ser
+    generadores largos sin materializar todas las tareas de antemano.
+    """
+    if pendientes_max is None:
+        pendientes_max = PENDIENTES_POR_WORKER * (workers or os.cpu_count() or 1)
+    argumentos = zip(*iterables)
+    en_vuelo = deque()
+    while True:
+        trozo = [args for _, args in zip(range(tamaño_trozo), argumentos)]
+        if not trozo:
+            break
+        if len(en_vuelo) >= pendientes_max:
+            yield from en_vuelo.popleft().result()
+        en_vuelo.append(ejecutor.submit(aplicar_trozo, funcion, trozo))
+    while en_vuelo:
+        yield from en_vuelo.popleft().result()
+
+
+def agregar_opciones(parser):
+    """Opciones --backend y --workers comunes a los programas que usan esta capa."""
+    parser.add_argument("--backend", choices=BACKENDS, default="procesos",
+                        help="serial, hilos (ThreadPoolExecutor), procesos (ProcessPoolExecutor), "
+                             "mpi (MPIPoolExecutor, lanzar con mpiexec -n 1) o dask (Client)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="número de workers del backend")
+    parser.add_argument("--trozo", type=int, default=1, help="elementos por tarea en el map")
@@ -20,6 +20,10 @@ def generate_graphs():
     df['Time'] = pd.to_numeric(df['Time'], errors='coerce')
     # Convert to milliseconds
     df['Time'] = df['Time'] * 1000
+    # Estadísticas de las repeticiones (Time es la mediana); los CSV antiguos no las traen
+    stat_cols = [c for c in ['Median', 'P95', 'Mean', 'Std', 'Min', 'Startup'] if c in df.columns]
+    for col in stat_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce') * 1000
     
     # Global Style Settings
     plt.rcParams.update({
@@ -55,9 +59,12 @@ def generate_graphs():
     for _, row in subset.iterrows():
         if row['Type'] == 'Sequential': colors.append('#555555') # Gray
         elif row['Type'] == 'MPI': colors.append('#1f77b4')      # Blue
+        elif row['Type'] == 'MPI-p2p': colors.append('#6baed6')  # Light blue
         elif row['Type'] == 'Dask': colors.append('#ff7f0e')     # Orange
     
-    bars = plt.bar(labels, subset['Time'], color=colors, edgecolor='black', alpha=0.8)
+    # Barras de error: desviación estándar de las repeticiones
+    yerr = subset['Std'].fillna(0) if 'Std' in subset else None
+    bars = plt.bar(labels, subset['Time'], yerr=yerr, capsize=4, color=colors, edgecolor='black', alpha=0.8)
     
     plt.title('Tiempo de Ejecución (500 Archivos)')
     plt.ylabel('Tiempo (ms)')
@@ -214,6 +221,24 @@ def generate_graphs():
     plt.savefig(os.path.join(output_dir, 'efficiency.png'), dpi=300)
     plt.close()
 
+    # --- 7. Variability (median vs p95) ---
+    if 'P95' in df.columns and df['P95'].notna().any():
+        print("Generando: variability.png")
+        plt.figure(figsize=(12, 7))
+        for type_name, marker in [('MPI', 's'), ('Dask', '^')]:
+            data = df[(df['Type'] == type_name) & (df['Files'] == 500)].sort_values('Workers')
+            line, = plt.plot(data['Workers'], data['Time'], marker=marker, label=f'{type_name} mediana')
+            plt.plot(data['Workers'], data['P95'], marker=marker, linestyle='--', color=line.get_color(),
+                     label=f'{type_name} p95')
+        plt.title('Variabilidad entre Repeticiones (500 Archivos)')
+        plt.xlabel('Número de Procesos/Workers')
+        plt.ylabel('Tiempo (ms)')
+        plt.legend()
+        plt.grid(True)
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, 'variability.png'), dpi=300)
+        plt.close()
+
     print("¡Generación de gráficos completada!")
 
 if __name__ == "__main__":
@@ -1,38 +1,150 @@
+import argparse
 import os
-import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+# Palabras que se sortean y escriben de una vez (la memoria por archivo no
+# depende de su tamaño)
+TROZO_PALABRAS = 1 << 16
+DISTRIBUCIONES = ("uniforme", "zipf")
+
+
+@lru_cache(maxsize=None)
+def cargar_vocabulario(vocab_path):
+    """
+    Lee el vocabulario (una palabra por línea) y lo codifica una sola vez
+    como una tabla de bytes de ancho fijo rellenada con ceros: la fila i es
+    la palabra i seguida de un espacio y la fila n + i, seguida de un salto
+    de línea. Devuelve (tabla, n).
+    """
+    with open(vocab_path, "r", encoding="utf-8") as f:
+        vocab = [w.strip() for w in f if w.strip()]
+    if not vocab:
+        raise RuntimeError("El archivo de vocabulario está vacío.")
+    codificadas = [w.encode("utf-8") + sep for sep in (b" ", b"\n") for w in vocab]
+    tabla = np.zeros((len(codificadas), max(map(len, codificadas))), dtype=np.uint8)
+    for fila, palabra in zip(tabla, codificadas):
+        fila[:len(palabra)] = np.frombuffer(palabra, dtype=np.uint8)
+    return tabla, len(vocab)
+
+
+@lru_cache(maxsize=None)
+def distribucion_zipf(n, s):
+    """Función de distribución acumulada de Zipf acotada a n palabras (la i-ésima con peso 1/i^s)."""
+    pesos = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** s
+    acumulada = np.cumsum(pesos)
+    return acumulada / acumulada[-1]
+
+
+def sortear_indices(rng, n_vocab, k, distribucion, zipf_s):
+    if distribucion == "zipf":
+        # El vocabulario está ordenado por frecuencia: la primera palabra es la más común
+        return np.searchsorted(distribucion_zipf(n_vocab, zipf_s), rng.random(k), side="right")
+    return rng.integers(0, n_vocab, size=k)
+
+
+def codificar(indices, tabla, n_vocab, palabras_por_linea, desfase):
+    """
+    Bytes del texto de las palabras `indices` (cada una seguida de su
+    separador): se toman sus filas de la tabla y se descarta el relleno.
+    desfase es la posición de la primera palabra en el archivo, para cortar
+    las líneas en su lugar.
+    """
+    if palabras_por_linea:
+        primera = (-desfase - 1) % palabras_por_linea
+        indices[primera::palabras_por_linea] += n_vocab
+    filas = tabla[indices]
+    return filas[filas != 0]
+
+
+def generar_archivo(path, semilla, min_words, max_words, vocab_path, distribucion="uniforme",
+                    zipf_s=1.1, palabras_por_linea=None):
+    """Escribe un archivo con su propio generador (semilla) por trozos. Devuelve la cantidad de palabras."""
+    tabla, n_vocab = cargar_vocabulario(vocab_path)
+    rng = np.random.default_rng(semilla)
+    count = int(rng.integers(min_words, max_words + 1))
+    with open(path, "wb") as f_out:
+        for desfase in range(0, count, TROZO_PALABRAS):
+            k = min(TROZO_PALABRAS, count - desfase)
+            indices = sortear_indices(rng, n_vocab, k, distribucion, zipf_s)
+            texto = codificar(indices, tabla, n_vocab, palabras_por_linea, desfase)
+            # Sin separador tras la última palabra del archivo
+            f_out.write(texto[:-1] if desfase + k == count else texto)
+    return count
+
 
 def generar_textos_español(
     num_files=100,
     min_words=90_000,
     max_words=100_000,
     word_list_path="spanish_words.info",
-    start_index=1
+    start_index=1,
+    semilla=None,
+    distribucion="uniforme",
+    zipf_s=1.1,
+    palabras_por_linea=None,
+    procesos=None,
+    directorio=None
 ):
     """
     Genera num_files archivos de texto (file_01.txt … file_100.txt)
-    en el mismo directorio que este script, cada uno con entre
-    min_words y max_words palabras en español, usando como vocabulario
+    en el mismo directorio que este script (o en directorio), cada uno con
+    entre min_words y max_words palabras en español, usando como vocabulario
     el archivo word_list_path (una palabra por línea).
+
+    Cada archivo usa la semilla (semilla, índice del archivo), así que con la
+    misma semilla el corpus se reproduce byte a byte, aunque se genere por
+    partes o con otro número de procesos. Las palabras se sortean de manera
+    uniforme o con una distribución de Zipf de exponente zipf_s; con
+    palabras_por_linea el texto se corta en líneas de ese largo. Devuelve la
+    semilla usada.
     """
     # Carpeta donde está este script
     script_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Ruta al vocabulario
+    directorio = directorio or script_dir
     vocab_path = os.path.join(script_dir, word_list_path)
-    with open(vocab_path, "r", encoding="utf-8") as f:
-        vocab = [w.strip() for w in f if w.strip()]
-    if not vocab:
-        raise RuntimeError("El archivo de vocabulario está vacío.")
+    cargar_vocabulario(vocab_path)  # falla aquí si el vocabulario está vacío
+    if semilla is None:
+        semilla = int(np.random.SeedSequence().entropy % 2 ** 32)
+        print(f"Semilla: {semilla}")
+
+    indices = range(start_index, start_index + num_files)
+    rutas = [os.path.join(directorio, f"file_{i:02d}.txt") for i in indices]
+    tareas = [(ruta, [semilla, i], min_words, max_words, vocab_path, distribucion, zipf_s, palabras_por_linea)
+              for ruta, i in zip(rutas, indices)]
+    procesos = min(procesos or os.cpu_count() or 1, max(num_files, 1))
+    if procesos == 1:
+        cuentas = (generar_archivo(*t) for t in tareas)
+        for ruta, count in zip(rutas, cuentas):
+            print(f"Creado {os.path.basename(ruta)} con {count} palabras")
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            for ruta, count in zip(rutas, pool.map(generar_archivo, *zip(*tareas))):
+                print(f"Creado {os.path.basename(ruta)} con {count} palabras")
+    return semilla
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el corpus de archivos de texto en español.")
+    parser.add_argument("num_files", type=int, nargs="?", default=100, help="cantidad de archivos")
+    parser.add_argument("--inicio", type=int, default=1, help="índice del primer archivo")
+    parser.add_argument("--min-palabras", type=int, default=90_000)
+    parser.add_argument("--max-palabras", type=int, default=100_000)
+    parser.add_argument("--semilla", type=int, default=None, help="semilla del corpus (por defecto, aleatoria)")
+    parser.add_argument("--distribucion", choices=DISTRIBUCIONES, default="uniforme")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="exponente de la distribución de Zipf")
+    parser.add_argument("--palabras-por-linea", type=int, default=None,
+                        help="corta el texto en líneas de este número de palabras (por defecto, una sola línea)")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--directorio", default=None, help="carpeta de salida (por defecto, la de este script)")
+    args = parser.parse_args()
+    generar_textos_español(args.num_files, args.min_palabras, args.max_palabras, start_index=args.inicio,
+                           semilla=args.semilla, distribucion=args.distribucion, zipf_s=args.zipf_s,
+                           palabras_por_linea=args.palabras_por_linea, procesos=args.procesos,
+                           directorio=args.directorio)
 
-    # Generar los archivos directamente en script_dir
-    for i in range(start_index, start_index + num_files):
-        count = random.randint(min_words, max_words)
-        palabras = random.choices(vocab, k=count)
-        filename = f"file_{i:02d}.txt"
-        path = os.path.join(script_dir, filename)
-        with open(path, "w", encoding="utf-8") as f_out:
-            f_out.write(" ".join(palabras))
-        print(f"Creado {filename} con {count} palabras")
 
 if __name__ == "__main__":
-    generar_textos_español()
+    main()
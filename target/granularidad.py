@@ -0,0 +1,46 @@
+import math
+import time
+
+# Duración objetivo de cada tarea de Dask. Por debajo de ~1 ms por tarea
+# domina el coste del planificador; muy por encima se pierde equilibrio.
+OBJETIVO_TAREA = 0.1
+
+# Aunque las tareas salgan largas, se generan al menos estas tareas por worker
+TAREAS_POR_WORKER_MIN = 2
+
+
+def medir(funcion, *args) -> float:
+    """Ejecuta funcion(*args) y devuelve los segundos que tardó (dentro del worker)."""
+    t0 = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - t0
+
+
+def calibrar(client, funcion, argumentos, unidades, total, objetivo=OBJETIVO_TAREA):
+    """
+    Ejecución piloto en un worker: corre funcion(*argumentos(unidades))
+    duplicando unidades hasta que tarda al menos objetivo / 4 o cubre total.
+    Devuelve (unidades por segundo, unidades del piloto, segundos del piloto).
+    """
+    unidades = max(1, min(unidades, total))
+    while True:
+        segundos = client.submit(medir, funcion, *argumentos(unidades), pure=False).result()
+        if segundos >= objetivo / 4 or unidades >= total:
+            return unidades / max(segundos, 1e-6), unidades, segundos
+        unidades = min(2 * unidades, total)
+
+
+def tamaño_tarea(velocidad, total, n_workers, objetivo=OBJETIVO_TAREA, minimo=1) -> int:
+    """
+    Unidades de trabajo por tarea para que cada una dure unos `objetivo`
+    segundos, acotadas para que haya al menos TAREAS_POR_WORKER_MIN por worker.
+    """
+    tope = math.ceil(total / (TAREAS_POR_WORKER_MIN * n_workers))
+    return max(minimo, min(int(velocidad * objetivo), tope))
+
+
+def agregar_opciones(parser):
+    """Opción --tarea-ms común a los programas de Dask."""
+    parser.add_argument("--tarea-ms", type=float, default=OBJETIVO_TAREA * 1000,
+                        help="duración objetivo de cada tarea; el tamaño de las tareas se calibra con una "
+                             "ejecución piloto (0 desactiva la calibración)")
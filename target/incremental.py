@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+from collections import Counter
+
+# Estado guardado entre ejecuciones (JSON):
+#   firma:    hash del vocabulario de referencia y de case_sensitive
+#   archivos: {ruta: {"huella": [tamaño, mtime_ns], "conteo": {palabra: cuenta}}}
+#   global:   suma de todos los conteos por archivo
+
+
+def firma_vocabulario(palabras_buscar, case_sensitive=False) -> str:
+    """Identifica el vocabulario; si cambia, el estado guardado deja de servir."""
+    h = hashlib.sha1(b"1" if case_sensitive else b"0")
+    for palabra in sorted(palabras_buscar):
+        h.update(palabra.encode("utf-8") + b"\n")
+    return h.hexdigest()
+
+
+def huella(ruta):
+    st = os.stat(ruta)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def cargar_estado(ruta_estado, firma):
+    """Carga el estado anterior, o uno vacío si no existe o es de otro vocabulario."""
+    try:
+        with open(ruta_estado, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+        if estado.get("firma") == firma:
+            return estado
+    except (OSError, ValueError):
+        pass
+    return {"firma": firma, "archivos": {}, "global": {}}
+
+
+def cambios(estado, archivos):
+    """
+    Compara los archivos actuales con el manifiesto. Devuelve
+    (pendientes {ruta: huella} nuevos o modificados, eliminados [ruta]).
+    """
+    actuales = {ruta: huella(ruta) for ruta in archivos}
+    pendientes = {r: h for r, h in actuales.items()
+                  if estado["archivos"].get(r, {}).get("huella") != h}
+    eliminados = [r for r in estado["archivos"] if r not in actuales]
+    return pendientes, eliminados
+
+
+def aplicar(estado, pendientes, conteos, eliminados) -> Counter:
+    """
+    Actualiza el estado: resta los archivos eliminados y la versión anterior de
+    los modificados y suma sus conteos nuevos. Devuelve el Counter global.
+    """
+    total = Counter(estado["global"])
+    for ruta in eliminados:
+        total.subtract(estado["archivos"].pop(ruta)["conteo"])
+    for ruta, h in pendientes.items():
+        anterior = estado["archivos"].get(ruta)
+        if anterior is not None:
+            total.subtract(anterior["conteo"])
+        conteo = conteos.get(ruta, Counter())
+        total.update(conteo)
+        estado["archivos"][ruta] = {"huella": h, "conteo": dict(conteo)}
+    estado["global"] = {p: c for p, c in total.items() if c > 0}
+    return Counter(estado["global"])
+
+
+def guardar_estado(ruta_estado, estado):
+    tmp = f"{ruta_estado}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(tmp, ruta_estado)
+
+
+def combinar_por_archivo(parciales):
+    """Suma varios {ruta: Counter} (un archivo puede venir en trozos de varios ranks)."""
+    conteos = {}
+    for parcial in parciales:
+        for ruta, conteo in parcial.items():
+            conteos.setdefault(ruta, Counter()).update(conteo)
+    return conteos
+
+
+def agregar_opciones(parser):
+    """Opción --incremental común a los programas de frecuencia de palabras."""
+    parser.add_argument("--incremental", metavar="ESTADO", default=None,
+                        help="archivo JSON con el resultado y el manifiesto de la ejecución anterior; "
+                             "solo se procesan los archivos nuevos o modificados")
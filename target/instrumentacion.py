@@ -0,0 +1,94 @@
+import json
+import pickle
+import sys
+from contextlib import contextmanager
+
+from mpi4py import MPI
+
+# Fases medidas en los programas MPI (cada programa usa las que le aplican)
+FASES = ("preparacion", "lectura", "descompresion", "tokenizacion", "conteo", "computo",
+         "comunicacion", "reparto", "reduccion", "espera")
+
+
+class Perfil:
+    """
+    Tiempos por fase, bytes y mensajes de un rank. Una colectiva cuenta como
+    un mensaje del rank con la carga que envía o recibe. Si no está activo
+    se siguen acumulando los tiempos (con coste despreciable), pero no se
+    serializan objetos para medir bytes ni se añaden barreras.
+    """
+
+    def __init__(self, comm, activo=True):
+        self.comm = comm
+        self.activo = activo
+        self.tiempos = dict.fromkeys(FASES, 0.0)
+        self.bytes = 0
+        self.mensajes = 0
+        self.t0 = MPI.Wtime()
+
+    def sumar(self, fase, segundos):
+        self.tiempos[fase] = self.tiempos.get(fase, 0.0) + segundos
+
+    @contextmanager
+    def fase(self, nombre):
+        t0 = MPI.Wtime()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, MPI.Wtime() - t0)
+
+    def iterar(self, fase, iterable):
+        """Recorre iterable sumando a `fase` solo el tiempo de producir cada elemento."""
+        it = iter(iterable)
+        while True:
+            t0 = MPI.Wtime()
+            try:
+                elemento = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.sumar(fase, MPI.Wtime() - t0)
+            yield elemento
+
+    def mensaje(self, obj=None, nbytes=None, n=1):
+        """Registra n mensajes de nbytes bytes (o lo que ocupa obj serializado con pickle)."""
+        if nbytes is None and obj is not None and self.activo:
+            nbytes = len(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+        self.bytes += n * (nbytes or 0)
+        self.mensajes += n
+
+    def barrera(self):
+        """Barrera medida como fase 'espera' (desequilibrio de carga); solo si está activo."""
+        if self.activo:
+            with self.fase("espera"):
+                self.comm.Barrier()
+
+    def registro(self, **extra):
+        return {"rank": self.comm.Get_rank(), "size": self.comm.Get_size(),
+                "total": MPI.Wtime() - self.t0,
+                "fases": {f: t for f, t in self.tiempos.items() if t > 0},
+                "bytes": self.bytes, "mensajes": self.mensajes, **extra}
+
+    def emitir(self, destino, programa, **extra):
+        """
+        Reúne en rank 0 el registro de cada rank y lo escribe como una línea JSON
+        por rank en destino ("-" para la salida estándar). Es colectiva.
+        """
+        registros = self.comm.gather(self.registro(programa=programa, **extra), root=0)
+        if self.comm.Get_rank() != 0:
+            return None
+        lineas = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+        if destino == "-":
+            sys.stdout.write(lineas)
+            sys.stdout.flush()
+        else:
+            with open(destino, "a", encoding="utf-8") as f:
+                f.write(lineas)
+        return registros
+
+
+def agregar_opciones(parser):
+    """Opción --perfil común a los programas MPI."""
+    parser.add_argument("--perfil", metavar="ARCHIVO", default=None,
+                        help="añade a ARCHIVO (o '-' para la salida estándar) una línea JSON por rank con "
+                             "los tiempos por fase, bytes y mensajes")
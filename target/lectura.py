@@ -0,0 +1,153 @@
+import mmap
+import os
+from collections import Counter
+
+import compresion
+from particion import ESPACIOS
+from vocabulario import normalizar
+
+# Tamaño de cada bloque leído del disco. La memoria por rank queda acotada por
+# este valor (más el contador), sin importar el tamaño del archivo.
+TAMAÑO_BLOQUE = 1024 * 1024
+
+
+def ultimo_espacio(datos: bytes) -> int:
+    """Posición del último byte de espacio en blanco de datos, o -1."""
+    pos = -1
+    for c in ESPACIOS:
+        # Tras encontrar un espacio solo hace falta revisar la cola posterior
+        pos = max(pos, datos.rfind(c, pos + 1))
+    return pos
+
+
+def leer_rango(ruta, inicio, fin, tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Bloques de bytes del rango [inicio, fin) de un archivo. En los archivos
+    comprimidos el rango abarca marcos completos y los bloques salen ya
+    descomprimidos (más grandes que tamaño_bloque, según la compresión).
+    """
+    fmt = compresion.formato(ruta)
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        if fmt is not None:
+            yield from compresion.descomprimir(f, fmt, fin - inicio, tamaño_bloque)
+            return
+        restante = fin - inicio
+        while restante > 0:
+            datos = f.read(min(tamaño_bloque, restante))
+            if not datos:
+                break
+            restante -= len(datos)
+            yield datos
+
+
+def iterar_bloques(trozo, case_sensitive=False, tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Lee el trozo (ruta, inicio, fin) en bloques binarios de tamaño fijo y
+    genera bloques ya normalizados que terminan en un espacio: la palabra
+    partida al final de cada bloque se arrastra al siguiente.
+    """
+    resto = b""
+    for datos in leer_rango(*trozo, tamaño_bloque):
+        datos = resto + datos
+        corte = ultimo_espacio(datos)
+        if corte < 0:
+            resto = datos
+            continue
+        resto = datos[corte + 1:]
+        yield normalizar(datos[:corte + 1], case_sensitive)
+    if resto:
+        yield normalizar(resto, case_sensitive)
+
+
+def iterar_bloques_mmap(trozo, case_sensitive=False, tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Igual que iterar_bloques pero sobre un mmap de solo lectura: los ranks del
+    mismo nodo comparten las páginas de la caché del sistema operativo y los
+    cortes de bloque se buscan directamente en el mapa, sin copias de arrastre.
+    """
+    ruta, inicio, fin = trozo
+    if fin <= inicio:
+        return
+    if compresion.formato(ruta) is not None:
+        # Un mapa de bytes comprimidos no sirve: se descomprime por bloques
+        yield from iterar_bloques(trozo, case_sensitive, tamaño_bloque)
+        return
+    with open(ruta, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = inicio
+        while pos < fin:
+            hasta = min(pos + tamaño_bloque, fin)
+            if hasta < fin:
+                corte = max(mm.rfind(bytes([c]), pos, hasta) for c in ESPACIOS)
+                if corte >= 0:
+                    hasta = corte + 1
+                else:
+                    # Palabra más larga que el bloque: avanzar hasta el siguiente espacio
+                    siguientes = [p for p in (mm.find(bytes([c]), hasta, fin) for c in ESPACIOS) if p >= 0]
+                    hasta = min(siguientes) + 1 if siguientes else fin
+            yield normalizar(mm[pos:hasta], case_sensitive)
+            pos = hasta
+
+
+def iterar_bloques_mpiio(comm, archivos, trozos, case_sensitive=False, tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Lectura con MPI-IO para sistemas de archivos paralelos. Todos los ranks
+    abren cada archivo de `archivos` (misma lista y orden en todos) y leen sus
+    propios trozos con Read_at_all colectivos; el rank que ya terminó participa
+    con lecturas de 0 bytes hasta completar las rondas.
+    """
+    from mpi4py import MPI
+
+    if any(compresion.formato(ruta) for ruta in archivos):
+        raise ValueError("El lector mpiio no admite archivos comprimidos; use --lector bloques o mmap.")
+    buf = bytearray(tamaño_bloque)
+    for ruta in archivos:
+        # (desplazamiento, bytes, ¿último bloque del trozo?)
+        lecturas = []
+        for r, inicio, fin in trozos:
+            if r == ruta:
+                for pos in range(inicio, fin, tamaño_bloque):
+                    n = min(tamaño_bloque, fin - pos)
+                    lecturas.append((pos, n, pos + n >= fin))
+        rondas = comm.allreduce(len(lecturas), op=MPI.MAX)
+        if rondas == 0:
+            continue
+
+        fh = MPI.File.Open(comm, ruta, MPI.MODE_RDONLY)
+        resto = b""
+        for k in range(rondas):
+            pos, n, ultimo = lecturas[k] if k < len(lecturas) else (0, 0, False)
+            fh.Read_at_all(pos, [buf, n, MPI.BYTE])
+            if n == 0:
+                continue
+            datos = resto + bytes(buf[:n])
+            # Los trozos terminan en espacio: al final de cada uno no hay arrastre
+            corte = len(datos) - 1 if ultimo else ultimo_espacio(datos)
+            if corte < 0:
+                resto = datos
+                continue
+            resto = datos[corte + 1:]
+            yield normalizar(datos[:corte + 1], case_sensitive)
+        fh.Close()
+
+
+def iterar_trozos(trozos, case_sensitive=False, lector="bloques"):
+    """Bloques normalizados de una lista de trozos con el lector local indicado."""
+    iterar = iterar_bloques_mmap if lector == "mmap" else iterar_bloques
+    for trozo in trozos:
+        yield from iterar(trozo, case_sensitive)
+
+
+def contar_palabras_trozos(trozos, vocab, case_sensitive=False, lector="bloques") -> Counter:
+    """Cuenta las apariciones de las palabras de vocab (str) en una lista de trozos."""
+    conteo = Counter()
+    for bloque in iterar_trozos(trozos, case_sensitive, lector):
+        for palabra in bloque.decode("utf-8").split():
+            if palabra in vocab:
+                conteo[palabra] += 1
+    return conteo
+
+
+def trozo_completo(ruta):
+    """Trozo (ruta, 0, tamaño) que cubre un archivo entero."""
+    return (ruta, 0, os.path.getsize(ruta))
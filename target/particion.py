@@ -0,0 +1,117 @@
+import bisect
+import heapq
+import os
+
+import compresion
+
+# Archivos más grandes que este umbral se dividen en trozos por rango de bytes
+UMBRAL_DIVISION = 64 * 1024 * 1024
+
+ESPACIOS = b" \t\n\r\x0b\x0c"
+
+
+def alinear_a_espacio(f, pos: int, tamaño: int) -> int:
+    """
+    Avanza pos hasta el siguiente byte de espacio en blanco (o el final del
+    archivo) para que ninguna palabra quede partida entre dos trozos.
+    Los espacios ASCII nunca forman parte de un carácter UTF-8 multibyte.
+    """
+    f.seek(pos)
+    while pos < tamaño:
+        bloque = f.read(64 * 1024)
+        if not bloque:
+            break
+        for i, b in enumerate(bloque):
+            if b in ESPACIOS:
+                return pos + i
+        pos += len(bloque)
+    return tamaño
+
+
+def siguiente_corte(f, ruta, pos: int, tamaño: int) -> int:
+    """
+    Primer punto de corte válido desde pos: un espacio en blanco en los
+    archivos de texto, o el final de un marco en los comprimidos (sin índice
+    de marcos un archivo comprimido no se puede cortar).
+    """
+    if compresion.formato(ruta) is None:
+        return alinear_a_espacio(f, pos, tamaño)
+    limites = compresion.marcos(ruta) or [tamaño]
+    return limites[bisect.bisect_left(limites, pos)] if pos <= limites[-1] else tamaño
+
+
+def trozos_archivo(ruta, umbral=UMBRAL_DIVISION):
+    """Devuelve los trozos (ruta, inicio, fin) en que se divide un archivo."""
+    tamaño = os.path.getsize(ruta)
+    if tamaño <= umbral:
+        return [(ruta, 0, tamaño)]
+    trozos = []
+    n = -(-tamaño // umbral)
+    with open(ruta, "rb") as f:
+        inicio = 0
+        for k in range(1, n + 1):
+            fin = tamaño if k == n else siguiente_corte(f, ruta, max(inicio, tamaño * k // n), tamaño)
+            if fin > inicio:
+                trozos.append((ruta, inicio, fin))
+            inicio = fin
+    return trozos
+
+
+def repartir_lpt(trozos, partes):
+    """
+    Reparto voraz LPT (longest processing time): los trozos se ordenan de mayor
+    a menor y cada uno va a la parte con menos bytes acumulados.
+    """
+    repartos = [[] for _ in range(partes)]
+    cargas = [(0, p) for p in range(partes)]
+    for trozo in sorted(trozos, key=lambda t: t[2] - t[1], reverse=True):
+        carga, p = heapq.heappop(cargas)
+        repartos[p].append(trozo)
+        heapq.heappush(cargas, (carga + trozo[2] - trozo[1], p))
+    return repartos
+
+
+def particionar(archivos, partes, umbral=UMBRAL_DIVISION):
+    """Divide los archivos en trozos y los reparte en `partes` listas equilibradas en bytes."""
+    trozos = []
+    for ruta in archivos:
+        trozos.extend(trozos_archivo(ruta, umbral))
+    return repartir_lpt(trozos, partes)
+
+
+def repartir_contiguo(archivos, partes):
+    """
+    Divide el corpus (los archivos concatenados en orden) en `partes` rangos
+    contiguos con el mismo número de bytes, con los cortes alineados a
+    espacios. Así un único archivo grande se reparte entre todos los ranks.
+    Devuelve, por parte, la lista de trozos (ruta, inicio, fin).
+    """
+    tamaños = [os.path.getsize(ruta) for ruta in archivos]
+    prefijos = [0]
+    for t in tamaños:
+        prefijos.append(prefijos[-1] + t)
+    total = prefijos[-1]
+
+    # Límites (índice de archivo, desplazamiento), en orden no decreciente
+    limites = [(0, 0)]
+    for k in range(1, partes):
+        g = total * k // partes
+        i = bisect.bisect_right(prefijos, g) - 1
+        if i >= len(archivos):
+            limites.append((len(archivos), 0))
+            continue
+        with open(archivos[i], "rb") as f:
+            desplazamiento = siguiente_corte(f, archivos[i], g - prefijos[i], tamaños[i])
+        limites.append(max(limites[-1], (i, desplazamiento)))
+    limites.append((len(archivos), 0))
+
+    repartos = []
+    for (i0, o0), (i1, o1) in zip(limites, limites[1:]):
+        trozos = []
+        for i in range(i0, min(i1, len(archivos) - 1) + 1):
+            inicio = o0 if i == i0 else 0
+            fin = o1 if i == i1 else tamaños[i]
+            if fin > inicio:
+                trozos.append((archivos[i], inicio, fin))
+        repartos.append(trozos)
+    return repartos
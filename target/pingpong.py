@@ -0,0 +1,179 @@
+from mpi4py import MPI
+import argparse
+import time
+import numpy as np
+
+import salida
+
+# Ping-pong entre los ranks 0 y 1 con los cuatro modos de envío de
+# sendtest.py, isendtest.py, ssendtest.py y lowLevelSendTest.py. Para cada
+# tamaño se mide la latencia de ida (mitad del viaje de ida y vuelta) y el
+# ancho de banda, y con una sonda (el receptor tarda --retraso segundos en
+# llamar a recv, como en esos ejemplos) se detecta a partir de qué tamaño el
+# envío deja de volver de inmediato: el cambio de protocolo eager a rendezvous.
+MODOS = ("send", "isend", "ssend", "Send")
+# isend vuelve siempre de inmediato, así que no tiene sentido sondearlo
+MODOS_SONDA = ("send", "ssend", "Send")
+
+# Bytes transferidos por tamaño y modo que fijan las iteraciones (los
+# mensajes pequeños se repiten más para que la medición sea estable)
+BYTES_POR_MEDICION = 256 * 2 ** 20
+ITERACIONES_MIN = 3
+CALENTAMIENTO = 2
+
+
+def formatear_bytes(n):
+    for unidad in ("B", "KiB", "MiB"):
+        if n < 1024 or unidad == "MiB":
+            return f"{n:g} {unidad}"
+        n /= 1024
+
+
+def tamaños(minimo, maximo):
+    """Potencias de dos de minimo a maximo (ambos incluidos si son potencias de dos)."""
+    n = minimo
+    while n <= maximo:
+        yield n
+        n *= 2
+
+
+def enviar(comm, modo, buf, destino):
+    """Envía buf con el modo indicado. En isend devuelve la petición sin esperarla."""
+    if modo == "send":
+        comm.send(buf, dest=destino)
+    elif modo == "isend":
+        return comm.isend(buf, dest=destino)
+    elif modo == "ssend":
+        comm.ssend(buf, dest=destino)
+    else:
+        comm.Send([buf, MPI.BYTE], dest=destino)
+    return None
+
+
+def recibir(comm, modo, recibido, origen):
+    if modo == "Send":
+        comm.Recv([recibido, MPI.BYTE], source=origen)
+    else:
+        comm.recv(source=origen)
+
+
+def ida_y_vuelta(comm, modo, buf, recibido):
+    """Un viaje de ida y vuelta entre los ranks 0 y 1 (el resto no participa)."""
+    rank = comm.Get_rank()
+    if rank == 0:
+        peticion = enviar(comm, modo, buf, 1)
+        recibir(comm, modo, recibido, 1)
+    elif rank == 1:
+        recibir(comm, modo, recibido, 0)
+        peticion = enviar(comm, modo, buf, 0)
+    else:
+        return
+    if peticion is not None:
+        peticion.wait()
+
+
+def medir_latencia(comm, modo, n, iteraciones):
+    """Latencia de ida (segundos) del modo con mensajes de n bytes, vista desde el rank 0."""
+    buf = np.zeros(n, dtype=np.uint8)
+    recibido = np.empty(n, dtype=np.uint8)
+    for _ in range(CALENTAMIENTO):
+        ida_y_vuelta(comm, modo, buf, recibido)
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    for _ in range(iteraciones):
+        ida_y_vuelta(comm, modo, buf, recibido)
+    return (MPI.Wtime() - t0) / (2 * iteraciones)
+
+
+def sondear(comm, modo, n, retraso):
+    """
+    Tiempo que tarda en volver el envío de n bytes cuando el receptor llama a
+    recv con `retraso` segundos de demora (solo en el rank 0). Si vuelve mucho
+    antes del retraso el mensaje viajó con protocolo eager; si espera, el envío
+    necesitó que el receptor estuviera listo (rendezvous o envío síncrono).
+    """
+    rank = comm.Get_rank()
+    buf = np.zeros(n, dtype=np.uint8)
+    recibido = np.empty(n, dtype=np.uint8)
+    comm.Barrier()
+    t = None
+    if rank == 0:
+        t0 = MPI.Wtime()
+        enviar(comm, modo, buf, 1)
+        t = MPI.Wtime() - t0
+    elif rank == 1:
+        time.sleep(retraso)
+        recibir(comm, modo, recibido, 0)
+    comm.Barrier()
+    return t
+
+
+def calcular_cruce(sondas, retraso):
+    """Mayor tamaño enviado en modo eager y menor tamaño que esperó al receptor, por modo."""
+    cruce = {}
+    for modo in MODOS_SONDA:
+        eager = [n for (m, n), t in sondas.items() if m == modo and t < retraso / 2]
+        bloquea = [n for (m, n), t in sondas.items() if m == modo and t >= retraso / 2]
+        cruce[modo] = {"eager_max": max(eager) if eager else None,
+                       "rendezvous_desde": min(bloquea) if bloquea else None}
+    return cruce
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Latencia, ancho de banda y cruce eager/rendezvous entre dos ranks.")
+    parser.add_argument("--min", type=int, default=8, help="tamaño mínimo del mensaje en bytes")
+    parser.add_argument("--max", type=int, default=256 * 2 ** 20, help="tamaño máximo del mensaje en bytes")
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    parser.add_argument("--iteraciones", type=int, default=1000,
+                        help="máximo de viajes de ida y vuelta por tamaño (menos en los mensajes grandes)")
+    parser.add_argument("--retraso", type=float, default=0.05,
+                        help="segundos que tarda el receptor en llamar a recv en la sonda eager/rendezvous")
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+
+    if size < 2:
+        if rank == 0:
+            print("Se necesitan al menos 2 procesos (mpiexec -n 2).")
+        return
+
+    t_inicio = MPI.Wtime()
+    mediciones = []
+    sondas = {}
+    for n in tamaños(args.min, args.max):
+        iteraciones = max(ITERACIONES_MIN, min(args.iteraciones, BYTES_POR_MEDICION // n))
+        for modo in args.modos:
+            latencia = medir_latencia(comm, modo, n, iteraciones)
+            t_sonda = sondear(comm, modo, n, args.retraso) if modo in MODOS_SONDA else None
+            if t_sonda is not None:
+                sondas[modo, n] = t_sonda
+            mediciones.append({"modo": modo, "bytes": n, "iteraciones": iteraciones, "latencia": latencia,
+                               "ancho_banda": n / latencia, "envio_sonda": t_sonda})
+            if rank == 0 and not args.json:
+                protocolo = "" if t_sonda is None else ("espera" if t_sonda >= args.retraso / 2 else "eager")
+                print(f"{formatear_bytes(n):>9} | {modo:>5} | {latencia * 1e6:>12.2f} µs | "
+                      f"{n / latencia / 1e6:>10.1f} MB/s | {protocolo}", flush=True)
+    t_fin = MPI.Wtime()
+
+    if rank != 0:
+        return
+    cruce = calcular_cruce(sondas, args.retraso)
+    if args.json:
+        salida.emitir_json("pingpong", t_fin - t_inicio, {"mediciones": mediciones, "cruce": cruce}, args,
+                           workers=size)
+        return
+    print("\nCruce eager -> rendezvous (el envío espera al receptor):")
+    for modo, c in cruce.items():
+        if modo not in args.modos:
+            continue
+        eager = formatear_bytes(c["eager_max"]) if c["eager_max"] else "ninguno"
+        espera = formatear_bytes(c["rendezvous_desde"]) if c["rendezvous_desde"] else "ninguno"
+        print(f"  {modo:>5}: eager hasta {eager}, espera desde {espera}")
+    print(f"Tiempo total: {t_fin - t_inicio:.3f} segundos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from mpi4py import MPI
+import numpy as np
+import pickle
+
+# Etiquetas del protocolo maestro/worker
+PEDIR = 1
+ASIGNAR = 2
+
+
+def tamaño_guiado(restante: int, size: int, minimo: int) -> int:
+    """Tamaño de trozo al estilo 'guided': proporcional a lo que queda, nunca menor que minimo."""
+    return max(minimo, restante // (2 * size))
+
+
+class Estadisticas:
+    """Tiempos, trozos procesados y mensajes de un rank durante el reparto."""
+
+    def __init__(self):
+        self.trozos = 0
+        self.t_computo = 0.0
+        self.t_espera = 0.0
+        self.mensajes = 0
+        self.bytes = 0
+
+    def mensaje(self, obj=None, nbytes=None):
+        self.mensajes += 1
+        self.bytes += nbytes if nbytes is not None else len(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+    def procesar(self, procesar, a, b):
+        t0 = MPI.Wtime()
+        resultado = procesar(a, b)
+        self.t_computo += MPI.Wtime() - t0
+        self.trozos += 1
+        return resultado
+
+
+def ejecutar_estatico(comm, rangos, procesar, stats):
+    """Procesa una lista fija de rangos asignados de antemano a este rank."""
+    total = 0
+    for a, b in rangos:
+        total += stats.procesar(procesar, a, b)
+    return total
+
+
+def ejecutar_rma(comm, inicio: int, fin: int, procesar, stats, minimo=1000):
+    """
+    Reparto dinámico sin maestro: un contador compartido en una ventana RMA de
+    rank 0 indica el siguiente número libre. Cada rank lee el contador para
+    calcular un trozo guiado con lo que queda y lo reclama con un
+    Fetch_and_op(SUM) atómico, que devuelve el inicio real de su trozo.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if size == 1:
+        return ejecutar_estatico(comm, [(inicio, fin)], procesar, stats)
+
+    n = fin - inicio
+    contador = np.zeros(1, dtype=np.int64) if rank == 0 else None
+    win = MPI.Win.Create(contador, disp_unit=8, comm=comm)
+
+    incremento = np.zeros(1, dtype=np.int64)
+    anterior = np.zeros(1, dtype=np.int64)
+    total = 0
+    win.Lock_all()
+    while True:
+        t0 = MPI.Wtime()
+        win.Fetch_and_op([incremento, MPI.INT64_T], [anterior, MPI.INT64_T], 0, 0, MPI.NO_OP)
+        win.Flush(0)
+        stats.mensaje(nbytes=8)
+        if anterior[0] < n:
+            incremento[0] = tamaño_guiado(n - int(anterior[0]), size, minimo)
+            win.Fetch_and_op([incremento, MPI.INT64_T], [anterior, MPI.INT64_T], 0, 0, MPI.SUM)
+            win.Flush(0)
+            stats.mensaje(nbytes=16)
+        stats.t_espera += MPI.Wtime() - t0
+        if anterior[0] >= n:
+            break
+        a = inicio + int(anterior[0])
+        total += stats.procesar(procesar, a, min(a + int(incremento[0]), fin))
+    win.Unlock_all()
+    win.Free()
+    return total
+
+
+def ejecutar_maestro(comm, inicio: int, fin: int, procesar, stats, minimo=1000):
+    """
+    Reparto dinámico con maestro: rank 0 solo reparte trozos guiados a los
+    workers que los piden. Con un único proceso, rank 0 lo calcula todo.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if size == 1:
+        return ejecutar_estatico(comm, [(inicio, fin)], procesar, stats)
+
+    if rank == 0:
+        siguiente = inicio
+        activos = size - 1
+        status = MPI.Status()
+        while activos > 0:
+            comm.recv(source=MPI.ANY_SOURCE, tag=PEDIR, status=status)
+            stats.mensaje(None)
+            if siguiente < fin:
+                b = min(siguiente + tamaño_guiado(fin - siguiente, size - 1, minimo), fin)
+                comm.send((siguiente, b), dest=status.Get_source(), tag=ASIGNAR)
+                stats.mensaje((siguiente, b))
+                siguiente = b
+            else:
+                comm.send(None, dest=status.Get_source(), tag=ASIGNAR)
+                stats.mensaje(None)
+                activos -= 1
+        return 0
+
+    total = 0
+    while True:
+        t0 = MPI.Wtime()
+        comm.send(None, dest=0, tag=PEDIR)
+        trozo = comm.recv(source=0, tag=ASIGNAR)
+        stats.t_espera += MPI.Wtime() - t0
+        stats.mensaje(None)
+        stats.mensaje(trozo)
+        if trozo is None:
+            break
+        total += stats.procesar(procesar, *trozo)
+    return total
+
+
+def esperar_y_reportar(comm, stats):
+    """
+    Mide la espera en la barrera final (desequilibrio de carga) y reúne en rank 0
+    las estadísticas de todos los ranks. Devuelve la lista en rank 0 y None en el resto.
+    """
+    t0 = MPI.Wtime()
+    comm.Barrier()
+    stats.t_espera += MPI.Wtime() - t0
+    return comm.gather((stats.trozos, stats.t_computo, stats.t_espera), root=0)
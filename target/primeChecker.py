@@ -1,20 +1,8 @@
-import math
-import sys
+import argparse
 import time
 
-
-def es_primo(n: int) -> bool:
-    """Verifica si un número es primo."""
-    if n < 2:
-        return False
-    if n == 2:
-        return True
-    if n % 2 == 0:
-        return False
-    for i in range(3, int(math.sqrt(n)) + 1, 2):
-        if n % i == 0:
-            return False
-    return True
+import salida
+from primos import es_primo, primos_base, limite_base, contar_primos_criba, contar_primos_vectorizado, TAMAÑO_SEGMENTO
 
 
 def contar_primos_en_batch(batch):
@@ -32,30 +20,54 @@ def generar_batches(inicio, fin, tamaño_batch):
 
 def main():
     # --- Leer parámetros desde línea de comandos ---
-    if len(sys.argv) < 2:
-        print("Uso: python code0_seq.py <num_digitos>")
-        print("Ejemplo: python code0_seq.py 4")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Cuenta los primos con un número dado de dígitos.")
+    parser.add_argument("num_digitos", type=int, help="Número de dígitos (ej. 4)")
+    parser.add_argument("--metodo", choices=["criba", "division", "vectorizado", "miller-rabin"], default="criba",
+                        help="criba segmentada (por defecto), división de prueba por lotes, o test vectorizado "
+                             "con NumPy por lotes (división de prueba o Miller–Rabin)")
+    parser.add_argument("--batch", type=int, default=10000, help="tamaño de cada lote de los métodos por lotes")
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
 
-    num_digitos = int(sys.argv[1])
+    num_digitos = args.num_digitos
 
     # --- Parámetros del problema ---
-    tamaño_batch = 10
+    tamaño_batch = args.batch
     inicio = 10 ** (num_digitos - 1)
     fin = (10 ** num_digitos) - 1
 
-    # --- Generar los batches ---
-    batches = generar_batches(inicio, fin, tamaño_batch)
-    print(f"\nContando primos de {num_digitos} dígitos (rango {inicio}-{fin})")
-    print(f"Total de batches: {len(batches)}\n")
+    if args.metodo == "criba":
+        if not args.json:
+            print(f"\nContando primos de {num_digitos} dígitos (rango {inicio}-{fin}) con criba segmentada")
+            print(f"Tamaño de segmento: {TAMAÑO_SEGMENTO} impares\n")
+
+        t0 = time.perf_counter()
+        base = primos_base(limite_base(fin + 1))
+        total_primos = contar_primos_criba(inicio, fin + 1, base)
+        elapsed = time.perf_counter() - t0
+    else:
+        # --- Generar los batches ---
+        batches = generar_batches(inicio, fin, tamaño_batch)
+        if not args.json:
+            print(f"\nContando primos de {num_digitos} dígitos (rango {inicio}-{fin})")
+            print(f"Total de batches: {len(batches)}\n")
 
-    # --- Ejecución secuencial ---
-    t0 = time.perf_counter()
-    resultados = [contar_primos_en_batch(b) for b in batches]
-    total_primos = sum(resultados)
-    elapsed = time.perf_counter() - t0
+        # --- Ejecución secuencial ---
+        t0 = time.perf_counter()
+        if args.metodo == "division":
+            resultados = [contar_primos_en_batch(b) for b in batches]
+        else:
+            # Cada lote se prueba entero como un arreglo de NumPy
+            test = "division" if args.metodo == "vectorizado" else "miller-rabin"
+            base = primos_base(limite_base(fin + 1)) if test == "division" else None
+            resultados = [contar_primos_vectorizado(a, b, base, test, tamaño_batch) for a, b in batches]
+        total_primos = sum(resultados)
+        elapsed = time.perf_counter() - t0
 
     # --- Resultados ---
+    if args.json:
+        salida.emitir_json("primeChecker", elapsed, {"primos": total_primos}, args, workers=1)
+        return
     print(f"\n✅ Total de primos con {num_digitos} dígitos: {total_primos}")
     print(f"⏱️ Tiempo total: {elapsed:.3f} s")
 
@@ -1,36 +1,12 @@
-import math
-import sys
+import argparse
 from dask import delayed, compute
 from dask.distributed import Client, LocalCluster
+import math
 import time
 
-
-def es_primo(n: int) -> bool:
-    """Verifica si un número es primo."""
-    if n < 2:
-        return False
-    if n == 2:
-        return True
-    if n % 2 == 0:
-        return False
-    for i in range(3, int(math.sqrt(n)) + 1, 2):
-        if n % i == 0:
-            return False
-    return True
-
-
-def contar_primos_en_batch(batch):
-    """Cuenta cuántos primos hay en un lote de números."""
-    inicio, fin = batch
-    cuenta = sum(1 for n in range(inicio, fin) if es_primo(n))
-    #print(f"Procesado batch {inicio}-{fin-1} → {cuenta} primos")
-    return cuenta
-
-
-@delayed
-def delayed_contar_primos_en_batch(batch):
-    """Versión delayed (para ejecución paralela)."""
-    return contar_primos_en_batch(batch)
+import granularidad
+import salida
+from primos import primos_base, limite_base, contar_primos_lote
 
 
 def generar_batches(inicio, fin, tamaño_batch):
@@ -40,40 +16,83 @@ def generar_batches(inicio, fin, tamaño_batch):
 
 def main():
     # --- Leer parámetros desde línea de comandos ---
-    if len(sys.argv) < 3:
-        print("Uso: python code0.py <num_digitos> <n_workers>")
-        print("Ejemplo: python code0.py 4 3")
-        sys.exit(1)
-
-    num_digitos = int(sys.argv[1])
-    n_workers = int(sys.argv[2])
+    parser = argparse.ArgumentParser(description="Cuenta primos de N dígitos con Dask.")
+    parser.add_argument("num_digitos", type=int, help="Número de dígitos (ej. 4)")
+    parser.add_argument("n_workers", type=int, help="Número de workers del cluster local")
+    parser.add_argument("--metodo", choices=["criba", "division", "vectorizado", "miller-rabin"], default="criba",
+                        help="criba segmentada (por defecto), división de prueba por lotes, o test vectorizado "
+                             "con NumPy por lotes (división de prueba o Miller–Rabin)")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="tamaño fijo de cada lote (una tarea por lote); si se omite se calibra con --tarea-ms")
+    granularidad.agregar_opciones(parser)
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+
+    num_digitos = args.num_digitos
+    n_workers = args.n_workers
 
     # --- Configuración del cluster local ---
     cluster = LocalCluster(n_workers=n_workers, threads_per_worker=1,processes=True )
     client = Client(cluster)
-    print(f"\nCluster Dask iniciado con {n_workers} workers")
-    print(f"Dashboard: {client.dashboard_link}")
+    if not args.json:
+        print(f"\nCluster Dask iniciado con {n_workers} workers")
+        print(f"Dashboard: {client.dashboard_link}")
 
     # --- Parámetros del problema ---
-    tamaño_batch = 10
     inicio = 10 ** (num_digitos - 1)
     fin = (10 ** num_digitos) - 1
+    total = fin + 1 - inicio
+    usa_base = args.metodo in ("criba", "vectorizado")
+
+    if not args.json:
+        print(f"\nContando primos de {num_digitos} dígitos (rango {inicio}-{fin}) con el método {args.metodo}")
+
+    t0 = time.perf_counter()
+
+    # --- Granularidad de las tareas ---
+    if args.batch:
+        tamaño_batch = args.batch
+        if not args.json:
+            print(f"Granularidad: {tamaño_batch} números por tarea (fija)")
+    elif args.tarea_ms > 0:
+        # Piloto en un worker a mitad del rango (el coste por número crece con n)
+        base_piloto = primos_base(limite_base(fin + 1)) if usa_base else None
+        medio = inicio + total // 2
+        velocidad, n_piloto, s_piloto = granularidad.calibrar(
+            client, contar_primos_lote, lambda u: ((medio, medio + u), args.metodo, base_piloto),
+            1000, fin + 1 - medio, args.tarea_ms / 1000)
+        tamaño_batch = granularidad.tamaño_tarea(velocidad, total, n_workers, args.tarea_ms / 1000, minimo=100)
+        if not args.json:
+            print(f"Granularidad: {tamaño_batch} números por tarea (objetivo {args.tarea_ms:.0f} ms; "
+                  f"piloto de {n_piloto} números en {s_piloto * 1000:.1f} ms)")
+    else:
+        # Sin calibración: varios lotes contiguos por worker
+        tamaño_batch = math.ceil(total / (4 * n_workers))
+        if not args.json:
+            print(f"Granularidad: {tamaño_batch} números por tarea (4 tareas por worker)")
 
     # --- Generar los batches ---
     batches = generar_batches(inicio, fin, tamaño_batch)
-    print(f"\nContando primos de {num_digitos} dígitos (rango {inicio}-{fin})")
-    print(f"Total de batches: {len(batches)}\n")
+    if not args.json:
+        print(f"Total de batches: {len(batches)}\n")
 
     # --- Crear tareas retrasadas (delayed) ---
-    tareas = [delayed_contar_primos_en_batch(b) for b in batches]
+    # Los primos base se calculan una sola vez en el cluster y todas
+    # las tareas comparten esa misma clave del grafo
+    base = delayed(primos_base)(limite_base(fin + 1)) if usa_base else None
+    tareas = [delayed(contar_primos_lote)(b, args.metodo, base) for b in batches]
 
     # --- Ejecutar en paralelo ---
-    t0 = time.perf_counter()
     resultados = compute(*tareas)
     total_primos = sum(resultados)
     elapsed = time.perf_counter() - t0
 
     # --- Resultados ---
+    if args.json:
+        salida.emitir_json("primeCheckerDask", elapsed, {"primos": total_primos}, args,
+                           workers=n_workers, tareas=len(batches), tamaño_batch=tamaño_batch)
+        client.close()
+        return
     print(f"\n✅ Total de primos con {num_digitos} dígitos: {total_primos}")
     print(f"⏱️ Tiempo total: {elapsed:.3f} s")
 
@@ -1,33 +1,26 @@
 from mpi4py import MPI
-import math
-import sys
-import time
+import argparse
+import numpy as np
+
+from primos import (contar_primos_en_rango, primos_base, limite_base, contar_primos_criba,
+                    contar_primos_vectorizado, dividir_rango, TAMAÑO_LOTE)
+from planificador import Estadisticas, ejecutar_estatico, ejecutar_rma, ejecutar_maestro, esperar_y_reportar
+import instrumentacion
+import salida
+
 
 # ------------------------------
 # Funciones auxiliares
 # ------------------------------
-def es_primo(n: int) -> bool:
-    """Determina si un número es primo."""
-    if n < 2:
-        return False
-    if n == 2:
-        return True
-    if n % 2 == 0:
-        return False
-    limite = int(math.sqrt(n)) + 1
-    for i in range(3, limite, 2):
-        if n % i == 0:
-            return False
-    return True
-
-
-def contar_primos_en_rango(inicio: int, fin: int) -> int:
-    """Cuenta los números primos en el rango [inicio, fin)."""
-    cuenta = 0
-    for n in range(inicio, fin):
-        if es_primo(n):
-            cuenta += 1
-    return cuenta
+def difundir_primos_base(comm, limite: int) -> np.ndarray:
+    """Rank 0 calcula los primos base una sola vez y los difunde con Bcast."""
+    rank = comm.Get_rank()
+    base = primos_base(limite) if rank == 0 else None
+    n_base = comm.bcast(len(base) if rank == 0 else None, root=0)
+    if rank != 0:
+        base = np.empty(n_base, dtype=np.int64)
+    comm.Bcast([base, MPI.INT64_T], root=0)
+    return base
 
 
 # ------------------------------
@@ -38,44 +31,99 @@ def main():
     rank = comm.Get_rank()
     size = comm.Get_size()
 
-    if len(sys.argv) < 2:
-        if rank == 0:
-            print("Uso: mpiexec -n <N> python code0_mpi.py <num_digitos>")
-        sys.exit(0)
-
-    num_digitos = int(sys.argv[1])
-    batch_size = 10  # tamaño de cada lote
+    parser = argparse.ArgumentParser(description="Cuenta primos de N dígitos con MPI.")
+    parser.add_argument("num_digitos", type=int, help="Número de dígitos (ej. 4)")
+    parser.add_argument("--metodo", choices=["criba", "division", "vectorizado", "miller-rabin"], default="criba",
+                        help="criba segmentada (por defecto), división de prueba por lotes, o test vectorizado "
+                             "con NumPy por lotes (división de prueba o Miller–Rabin)")
+    parser.add_argument("--batch", type=int, default=10000,
+                        help="tamaño de cada lote del reparto estático de los métodos por lotes")
+    parser.add_argument("--planificador", choices=["estatico", "rma", "maestro"], default="estatico",
+                        help="estatico: reparto fijo (por defecto); rma: contador compartido con Fetch_and_op; "
+                             "maestro: rank 0 reparte trozos guiados")
+    parser.add_argument("--trozo-min", type=int, default=1000,
+                        help="tamaño mínimo (en números) de los trozos del reparto dinámico")
+    instrumentacion.agregar_opciones(parser)
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+
+    num_digitos = args.num_digitos
+    batch_size = args.batch  # tamaño de cada lote
 
     # Rango de números según número de dígitos
     inicio_total = 10 ** (num_digitos - 1)
     fin_total = 10 ** num_digitos
 
-    # Dividir en lotes de tamaño batch_size
-    batches = [(i, min(i + batch_size, fin_total)) for i in range(inicio_total, fin_total, batch_size)]
-
-    # Distribuir lotes entre procesos
-    lotes_locales = [b for i, b in enumerate(batches) if i % size == rank]
-
     # Sincronización de tiempo
     comm.Barrier()
     t0 = MPI.Wtime()
-
-    # Calcular localmente
-    cuenta_local = 0
-    for inicio, fin in lotes_locales:
-        cuenta_local += contar_primos_en_rango(inicio, fin)
+    perfil = instrumentacion.Perfil(comm, activo=args.perfil is not None)
+
+    if args.metodo in ("criba", "vectorizado"):
+        with perfil.fase("comunicacion"):
+            base = difundir_primos_base(comm, limite_base(fin_total))
+            perfil.mensaje(nbytes=base.nbytes)
+    if args.metodo == "criba":
+        procesar = lambda a, b: contar_primos_criba(a, b, base)
+    elif args.metodo == "vectorizado":
+        procesar = lambda a, b: contar_primos_vectorizado(a, b, base, "division", min(batch_size, TAMAÑO_LOTE))
+    elif args.metodo == "miller-rabin":
+        procesar = lambda a, b: contar_primos_vectorizado(a, b, None, "miller-rabin", min(batch_size, TAMAÑO_LOTE))
+    else:
+        procesar = contar_primos_en_rango
+
+    stats = Estadisticas()
+    if args.planificador == "rma":
+        cuenta_local = ejecutar_rma(comm, inicio_total, fin_total, procesar, stats, args.trozo_min)
+    elif args.planificador == "maestro":
+        cuenta_local = ejecutar_maestro(comm, inicio_total, fin_total, procesar, stats, args.trozo_min)
+    elif args.metodo == "criba":
+        # Cada proceso criba su propio segmento contiguo del rango
+        segmento = dividir_rango(inicio_total, fin_total, size)[rank]
+        cuenta_local = ejecutar_estatico(comm, [segmento], procesar, stats)
+    else:
+        # Dividir en lotes de tamaño batch_size
+        batches = [(i, min(i + batch_size, fin_total)) for i in range(inicio_total, fin_total, batch_size)]
+
+        # Distribuir lotes entre procesos
+        lotes_locales = [b for i, b in enumerate(batches) if i % size == rank]
+
+        # Calcular localmente
+        cuenta_local = ejecutar_estatico(comm, lotes_locales, procesar, stats)
 
     # Reducir resultados
-    total_primos = comm.reduce(cuenta_local, op=MPI.SUM, root=0)
+    t_reparto = stats.t_espera
+    estadisticas = esperar_y_reportar(comm, stats)
+    with perfil.fase("reduccion"):
+        total_primos = comm.reduce(cuenta_local, op=MPI.SUM, root=0)
+        perfil.mensaje(nbytes=8)
 
     t1 = MPI.Wtime()
 
-    if rank == 0:
+    if rank == 0 and args.json:
+        salida.emitir_json("primeCheckerMPI", t1 - t0, {"primos": total_primos}, args, workers=size,
+                           ranks=[{"trozos": t, "computo": c, "ocioso": e} for t, c, e in estadisticas])
+    elif rank == 0:
         print(f"\n=== RESULTADO MPI ===")
         print(f"Número de dígitos: {num_digitos}")
+        print(f"Método: {args.metodo}")
         print(f"Total de primos encontrados: {total_primos}")
         print(f"Tiempo total: {t1 - t0:.3f} segundos")
         print(f"Procesos usados: {size}")
+        print(f"Planificador: {args.planificador}")
+        print(f"{'Rank':>4} | {'Trozos':>7} | {'Cómputo (s)':>11} | {'Ocioso (s)':>10}")
+        for r, (trozos, t_computo, t_espera) in enumerate(estadisticas):
+            print(f"{r:>4} | {trozos:>7} | {t_computo:>11.3f} | {t_espera:>10.3f}")
+
+    if args.perfil:
+        # Tiempo de cómputo, de pedir trozos (reparto) y de espera en la barrera final
+        perfil.sumar("computo", stats.t_computo)
+        perfil.sumar("reparto", t_reparto)
+        perfil.sumar("espera", stats.t_espera - t_reparto)
+        perfil.mensajes += stats.mensajes
+        perfil.bytes += stats.bytes
+        perfil.emitir(args.perfil, "primeCheckerMPI", metodo=args.metodo, planificador=args.planificador,
+                      trozos=stats.trozos)
 
 
 if __name__ == "__main__":
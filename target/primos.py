@@ -0,0 +1,235 @@
+import math
+
+import numpy as np
+
+# Tamaño de cada segmento de la criba (en entradas de 1 byte). 256 KB caben
+# holgadamente en la caché L2 de la mayoría de procesadores actuales.
+TAMAÑO_SEGMENTO = 256 * 1024
+
+# Rueda módulo 2·3·5·7: solo 48 de cada 210 números pueden ser primos (> 7).
+RUEDA = 210
+PRIMOS_RUEDA = np.array([2, 3, 5, 7], dtype=np.int64)
+COPRIMOS_RUEDA = np.array([math.gcd(r, RUEDA) == 1 for r in range(RUEDA)])
+
+# Tamaño de los lotes en que se recorre un rango con los tests vectorizados.
+TAMAÑO_LOTE = 64 * 1024
+
+# Bases de Miller–Rabin deterministas para n < 2^32 (Jaeschke). Con n < 2^32
+# los productos a·b mod n caben en uint64 sin desbordarse.
+BASES_MILLER_RABIN = (2, 7, 61)
+LIMITE_MILLER_RABIN = 2 ** 32
+
+
+def es_primo(n: int) -> bool:
+    """Verifica si un número es primo por división de prueba."""
+    if n < 2:
+        return False
+    if n == 2:
+        return True
+    if n % 2 == 0:
+        return False
+    for i in range(3, int(math.sqrt(n)) + 1, 2):
+        if n % i == 0:
+            return False
+    return True
+
+
+def contar_primos_en_rango(inicio: int, fin: int) -> int:
+    """Cuenta los números primos en el rango [inicio, fin) por división de prueba."""
+    return sum(1 for n in range(inicio, fin) if es_primo(n))
+
+
+def primos_base(limite: int) -> np.ndarray:
+    """Devuelve los primos <= limite (criba de Eratóstenes clásica)."""
+    if limite < 2:
+        return np.empty(0, dtype=np.int64)
+    es_p = np.ones(limite + 1, dtype=bool)
+    es_p[:2] = False
+    es_p[4::2] = False
+    for p in range(3, math.isqrt(limite) + 1, 2):
+        if es_p[p]:
+            es_p[p * p::2 * p] = False
+    return np.flatnonzero(es_p).astype(np.int64)
+
+
+def limite_base(fin: int) -> int:
+    """Mayor primo base necesario para cribar números menores que fin."""
+    return math.isqrt(max(fin - 1, 0))
+
+
+def contar_primos_criba(inicio: int, fin: int, base=None, tamaño_segmento=TAMAÑO_SEGMENTO) -> int:
+    """
+    Cuenta los primos en [inicio, fin) con una criba de Eratóstenes segmentada.
+
+    Solo se representan los impares (una entrada bool por impar) y el rango se
+    recorre en segmentos de tamaño_segmento entradas para que cada segmento
+    quepa en caché. base son los primos <= sqrt(fin - 1); si no se pasan se
+    calculan aquí.
+    """
+    inicio = max(inicio, 0)
+    if fin <= inicio:
+        return 0
+    if base is None:
+        base = primos_base(limite_base(fin))
+    impares = base[base > 2]
+
+    cuenta = 1 if inicio <= 2 < fin else 0
+    paso = 2 * tamaño_segmento
+    for lo in range(inicio, fin, paso):
+        hi = min(lo + paso, fin)
+        primer_impar = lo | 1
+        n = (hi - primer_impar + 1) // 2
+        if n <= 0:
+            continue
+        segmento = np.ones(n, dtype=bool)
+        if primer_impar == 1:
+            segmento[0] = False
+
+        activos = impares[impares * impares < hi]
+        # Primer múltiplo impar de cada primo dentro del segmento (>= p*p).
+        primeros = np.maximum(activos * activos, (lo + activos - 1) // activos * activos)
+        primeros += activos * (primeros % 2 == 0)
+        for p, m in zip(activos.tolist(), primeros.tolist()):
+            if m < hi:
+                segmento[(m - primer_impar) // 2::p] = False
+        cuenta += int(np.count_nonzero(segmento))
+    return cuenta
+
+
+def marcar_primos(inicio: int, fin: int, base=None) -> np.ndarray:
+    """
+    Devuelve una máscara bool de longitud fin - inicio donde True indica que
+    inicio + i es primo (criba de un único segmento).
+    """
+    es_p = np.ones(max(fin - inicio, 0), dtype=bool)
+    if len(es_p) == 0:
+        return es_p
+    if base is None:
+        base = primos_base(limite_base(fin))
+    es_p[:max(0, min(2 - inicio, len(es_p)))] = False
+    for p in base[base * base < fin].tolist():
+        primero = max(p * p, (inicio + p - 1) // p * p)
+        es_p[primero - inicio::p] = False
+    return es_p
+
+
+def filtrar_rueda(numeros: np.ndarray) -> np.ndarray:
+    """Máscara de candidatos a primo: 2, 3, 5, 7 y los coprimos con 210 (> 1)."""
+    return (COPRIMOS_RUEDA[numeros % RUEDA] & (numeros > 1)) | np.isin(numeros, PRIMOS_RUEDA)
+
+
+def es_primo_division_lote(numeros: np.ndarray, base=None) -> np.ndarray:
+    """
+    Test de primalidad vectorizado de un arreglo de enteros: filtro de rueda y
+    división de prueba por los primos base sobre todo el arreglo a la vez. Los
+    candidatos se compactan tras cada primo, así que los compuestos con un
+    factor pequeño salen enseguida. base son los primos <= sqrt(max(numeros)).
+    """
+    numeros = np.asarray(numeros, dtype=np.int64)
+    resultado = filtrar_rueda(numeros)
+    if len(numeros) == 0:
+        return resultado
+    if base is None:
+        base = primos_base(limite_base(int(numeros.max()) + 1))
+    indices = np.flatnonzero(resultado & (numeros > 7))
+    vivos = numeros[indices]
+    for p in base[(base > 7) & (base * base <= vivos.max(initial=0))].tolist():
+        if len(vivos) == 0:
+            break
+        compuestos = (vivos % p == 0) & (vivos != p)
+        if compuestos.any():
+            resultado[indices[compuestos]] = False
+            sigue = ~compuestos
+            indices, vivos = indices[sigue], vivos[sigue]
+        # Los que quedan por debajo de p² ya no pueden tener un factor mayor
+        pendientes = vivos >= p * p
+        indices, vivos = indices[pendientes], vivos[pendientes]
+    return resultado
+
+
+def potencia_modular(b: np.ndarray, e: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """b^e mod n elemento a elemento (uint64, n < 2^32)."""
+    resultado = np.ones_like(n)
+    b = b % n
+    for _ in range(int(e.max()).bit_length()):
+        resultado = np.where(e & np.uint64(1), resultado * b % n, resultado)
+        b = b * b % n
+        e = e >> np.uint64(1)
+    return resultado
+
+
+def es_primo_miller_rabin_lote(numeros: np.ndarray) -> np.ndarray:
+    """
+    Miller–Rabin determinista vectorizado (bases 2, 7, 61) tras el filtro de
+    rueda. Exacto para n < 2^32; los valores mayores se resuelven por división
+    de prueba vectorizada.
+    """
+    numeros = np.asarray(numeros, dtype=np.int64)
+    resultado = filtrar_rueda(numeros)
+    grandes = numeros >= LIMITE_MILLER_RABIN
+    if grandes.any():
+        resultado[grandes] = es_primo_division_lote(numeros[grandes])
+    indices = np.flatnonzero(resultado & (numeros > 7) & ~grandes)
+    if len(indices) == 0:
+        return resultado
+    n = numeros[indices].astype(np.uint64)
+
+    # n - 1 = d · 2^s con d impar
+    d = n - np.uint64(1)
+    s = np.zeros(len(n), dtype=np.int64)
+    while True:
+        pares = (d & np.uint64(1)) == 0
+        if not pares.any():
+            break
+        d = np.where(pares, d >> np.uint64(1), d)
+        s += pares
+
+    primo = np.ones(len(n), dtype=bool)
+    for a in BASES_MILLER_RABIN:
+        testigo = np.full(len(n), a, dtype=np.uint64)
+        x = potencia_modular(testigo, d, n)
+        pasa = (x == 1) | (x == n - np.uint64(1)) | (n == np.uint64(a))
+        for r in range(1, int(s.max())):
+            x = x * x % n
+            pasa |= (x == n - np.uint64(1)) & (r < s)
+        primo &= pasa
+    resultado[indices] = primo
+    return resultado
+
+
+def contar_primos_vectorizado(inicio: int, fin: int, base=None, test="division", tamaño_lote=TAMAÑO_LOTE) -> int:
+    """
+    Cuenta los primos en [inicio, fin) aplicando un test vectorizado
+    ("division" o "miller-rabin") a lotes de tamaño_lote números.
+    """
+    if test == "division" and base is None:
+        base = primos_base(limite_base(fin))
+    cuenta = 0
+    for lo in range(max(inicio, 0), fin, tamaño_lote):
+        numeros = np.arange(lo, min(lo + tamaño_lote, fin), dtype=np.int64)
+        if test == "division":
+            cuenta += int(np.count_nonzero(es_primo_division_lote(numeros, base)))
+        else:
+            cuenta += int(np.count_nonzero(es_primo_miller_rabin_lote(numeros)))
+    return cuenta
+
+
+def contar_primos_lote(lote, metodo="criba", base=None) -> int:
+    """
+    Cuenta los primos de un lote (inicio, fin) con el método indicado:
+    "criba", "division", "vectorizado" o "miller-rabin".
+    """
+    inicio, fin = lote
+    if metodo == "criba":
+        return contar_primos_criba(inicio, fin, base)
+    if metodo == "division":
+        return contar_primos_en_rango(inicio, fin)
+    test = "division" if metodo == "vectorizado" else "miller-rabin"
+    return contar_primos_vectorizado(inicio, fin, base, test)
+
+
+def dividir_rango(inicio: int, fin: int, partes: int):
+    """Divide [inicio, fin) en `partes` subrangos contiguos de tamaño similar."""
+    total = max(fin - inicio, 0)
+    cortes = [inicio + (total * i) // partes for i in range(partes + 1)]
+    return [(cortes[i], cortes[i + 1]) for i in range(partes)]
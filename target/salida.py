@@ -0,0 +1,35 @@
+import json
+
+# Salida legible por máquina común a todos los programas: con --json el
+# resultado se imprime como una única línea JSON con "programa", "tiempo"
+# (segundos medidos dentro del propio programa), "resultado" y "configuracion".
+
+
+def agregar_opciones(parser):
+    """Opción --json común a todas las cargas de trabajo."""
+    parser.add_argument("--json", action="store_true",
+                        help="imprime el resultado como una línea JSON (tiempo, resultado y configuración) "
+                             "en lugar del texto")
+
+
+def emitir_json(programa, tiempo, resultado, args=None, **extra):
+    """Imprime el registro JSON del resultado de un programa."""
+    configuracion = {k: v for k, v in vars(args).items() if k != "json"} if args is not None else {}
+    registro = {"programa": programa, "tiempo": tiempo, **extra,
+                "resultado": resultado, "configuracion": configuracion}
+    print(json.dumps(registro, ensure_ascii=False), flush=True)
+
+
+def leer_json(texto):
+    """Devuelve el último registro de resultado JSON de la salida de un programa, o None."""
+    for linea in reversed((texto or "").splitlines()):
+        linea = linea.strip()
+        if not linea.startswith("{"):
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError:
+            continue
+        if isinstance(registro, dict) and "programa" in registro and "resultado" in registro:
+            return registro
+    return None
@@ -0,0 +1,153 @@
+import argparse
+import json
+import socket
+import socketserver
+import time
+
+import ejecutores
+from ejecutar import TRABAJOS
+
+# Servicio de ejecución persistente: mantiene pools de workers calientes
+# (LocalCluster de Dask, MPIPoolExecutor u otro backend de ejecutores.py)
+# entre trabajos, de modo que cada medición incluye solo el cómputo. El
+# arranque de cada pool se mide aparte.
+#
+# Protocolo: una conexión TCP local por petición; el cliente envía una línea
+# JSON y recibe una línea JSON.
+#   {"trabajo": "wordfreq", "workers": 4, "directorio": ..., "top": 5}
+#   {"trabajo": "primos", "workers": 4, "digitos": 7, "metodo": "criba"}
+#   {"trabajo": "estado"} / {"trabajo": "detener"}
+
+HOST = "127.0.0.1"
+PUERTO = 5757
+
+
+class Servicio:
+    """Pools de workers calientes por número de workers, creados bajo demanda."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.pools = {}      # n -> (ejecutor, cerrar)
+        self.arranques = {}  # n -> segundos que tardó en arrancar el pool
+        self.detenido = False
+
+    def pool(self, n):
+        """Devuelve (ejecutor, segundos de arranque); el arranque es 0 si el pool ya existía."""
+        if n in self.pools:
+            return self.pools[n][0], 0.0
+        t0 = time.perf_counter()
+        self.pools[n] = ejecutores.crear(self.backend, n)
+        self.arranques[n] = time.perf_counter() - t0
+        return self.pools[n][0], self.arranques[n]
+
+    def atender(self, peticion):
+        trabajo = peticion.get("trabajo")
+        if trabajo == "estado":
+            return {"ok": True, "backend": self.backend, "arranques": self.arranques}
+        if trabajo == "detener":
+            self.detenido = True
+            return {"ok": True}
+        if trabajo not in TRABAJOS:
+            return {"ok": False, "error": f"trabajo desconocido: {trabajo}"}
+        n = int(peticion.get("workers", 1))
+        ejecutor, arranque = self.pool(n)
+        t0 = time.perf_counter()
+        resultado = TRABAJOS[trabajo](ejecutor, n, peticion)
+        return {"ok": True, "tiempo": time.perf_counter() - t0, "arranque": arranque, "resultado": resultado}
+
+    def cerrar(self):
+        for _, cerrar in self.pools.values():
+            cerrar()
+        self.pools.clear()
+
+
+def servir(backend, host=HOST, puerto=PUERTO):
+    servicio = Servicio(backend)
+
+    class Manejador(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                respuesta = servicio.atender(json.loads(self.rfile.readline()))
+            except Exception as e:
+                respuesta = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    socketserver.TCPServer.allow_reuse_address = True
+    with socketserver.TCPServer((host, puerto), Manejador) as servidor:
+        print(f"Servicio {backend} escuchando en {host}:{puerto}", flush=True)
+        try:
+            while not servicio.detenido:
+                servidor.handle_request()
+        finally:
+            servicio.cerrar()
+
+
+def enviar(peticion, host=HOST, puerto=PUERTO, timeout=None):
+    """Envía una petición al servicio y devuelve la respuesta (dict)."""
+    with socket.create_connection((host, puerto), timeout=timeout) as s:
+        s.sendall(json.dumps(peticion).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def esperar(host=HOST, puerto=PUERTO, timeout=60.0) -> bool:
+    """Espera a que el servicio acepte conexiones; devuelve False si no lo hace a tiempo."""
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            return enviar({"trabajo": "estado"}, host, puerto, timeout=5).get("ok", False)
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def main():
+    conexion = argparse.ArgumentParser(add_help=False)
+    conexion.add_argument("--host", default=HOST)
+    conexion.add_argument("--puerto", type=int, default=PUERTO)
+
+    parser = argparse.ArgumentParser(description="Servicio persistente de ejecución (pools de workers calientes).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_servir = sub.add_parser("servir", parents=[conexion], help="arranca el servicio")
+    p_servir.add_argument("--backend", choices=ejecutores.BACKENDS, default="dask",
+                          help="dask: LocalCluster; mpi: MPIPoolExecutor (lanzar con mpiexec -n 1); "
+                               "o cualquier otro backend de ejecutores.py")
+
+    p_enviar = sub.add_parser("enviar", parents=[conexion], help="envía un trabajo al servicio e imprime el resultado")
+    p_enviar.add_argument("trabajo", choices=sorted(TRABAJOS) + ["estado", "detener"])
+    p_enviar.add_argument("--workers", type=int, default=1)
+    p_enviar.add_argument("--directorio", default=None, help="directorio de los .txt (visto desde el servicio)")
+    p_enviar.add_argument("--top", type=int, default=5)
+    p_enviar.add_argument("--digitos", type=int, default=7)
+    p_enviar.add_argument("--metodo", default="criba")
+    args = parser.parse_args()
+
+    if args.comando == "servir":
+        servir(args.backend, args.host, args.puerto)
+        return
+
+    peticion = {"trabajo": args.trabajo, "workers": args.workers, "top": args.top,
+                "digitos": args.digitos, "metodo": args.metodo}
+    if args.directorio:
+        peticion["directorio"] = args.directorio
+    respuesta = enviar(peticion, args.host, args.puerto)
+    if not respuesta.get("ok"):
+        print(f"Error: {respuesta.get('error')}")
+        raise SystemExit(1)
+    if "tiempo" not in respuesta:
+        print(json.dumps(respuesta, ensure_ascii=False))
+        return
+    print(f"Tiempo de ejecución: {respuesta['tiempo']:.3f} segundos")
+    print(f"Arranque del pool: {respuesta['arranque']:.3f} segundos")
+    resultado = respuesta["resultado"]
+    if "top" in resultado:
+        print(f"\nTop {len(resultado['top'])} palabras de file_01.txt en otros archivos:")
+        for palabra, cuenta in resultado["top"]:
+            print(f"  {palabra}: {cuenta}")
+    else:
+        print(f"Total de primos con {args.digitos} dígitos: {resultado['primos']}")
+
+
+if __name__ == "__main__":
+    main()
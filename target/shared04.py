@@ -1,73 +1,158 @@
 from mpi4py import MPI
 import numpy as np
-import math
-import time
-
-def es_primo(n):
-    if n < 2:
-        return False
-    if n % 2 == 0 and n != 2:
-        return False
-    for i in range(3, int(math.sqrt(n)) + 1, 2):
-        if n % i == 0:
-            return False
-    return True
-
-comm = MPI.COMM_WORLD
-rank = comm.Get_rank()
-size = comm.Get_size()
-
-# Lista de números de 4 dígitos
-numeros = np.arange(1000, 10000, dtype='i')
-total = len(numeros)
-
-# Proceso 0 reserva memoria para todos los números
-win = MPI.Win.Allocate_shared(
-    numeros.nbytes if rank == 0 else 0,
-    disp_unit=numeros.itemsize,
-    comm=comm
-)
-
-# Todos acceden a la memoria compartida
-buf, itemsize = win.Shared_query(0)
-array = np.ndarray(buffer=buf, dtype='i', shape=(total,))
-
-comm.Barrier()
-
-# Solo el proceso 0 inicializa la matriz
-if rank == 0:
-    array[:] = numeros
-
-comm.Barrier()
-
-# Todos los procesos trabajan en paralelo
-while True:
-    encontrado = False
-    for i in range(rank, total, size):
-        win.Lock(rank=0)
-        val = array[i]
-        if val > 0:
-            array[i] = -1  # marcar como en revisión
-            win.Unlock(rank=0)
-
-            # Verificar si es primo
-            primo = es_primo(val)
+import argparse
 
+from primos import es_primo, primos_base, limite_base, marcar_primos
+from planificador import Estadisticas, ejecutar_rma
+import salida
+
+
+def clasificar_con_locks(comm, inicio, n):
+    """
+    Versión original: cada número se reclama y se marca tomando win.Lock(rank=0)
+    dos veces, con rondas que terminan en un allreduce. Devuelve la cantidad de
+    primos (en rank 0) y el tiempo. Los resultados se marcan con valores no
+    positivos (-2 primo, 0 no primo) para que la ronda siguiente no los
+    vuelva a tomar como números pendientes.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    # Lista de números a clasificar
+    numeros = np.arange(inicio, inicio + n, dtype='i')
+    total = len(numeros)
+
+    # Proceso 0 reserva memoria para todos los números
+    win = MPI.Win.Allocate_shared(
+        numeros.nbytes if rank == 0 else 0,
+        disp_unit=numeros.itemsize,
+        comm=comm
+    )
+
+    # Todos acceden a la memoria compartida
+    buf, itemsize = win.Shared_query(0)
+    array = np.ndarray(buffer=buf, dtype='i', shape=(total,))
+
+    comm.Barrier()
+
+    # Solo el proceso 0 inicializa la matriz
+    if rank == 0:
+        array[:] = numeros
+
+    comm.Barrier()
+    t0 = MPI.Wtime()
+
+    # Todos los procesos trabajan en paralelo
+    while True:
+        encontrado = False
+        for i in range(rank, total, size):
             win.Lock(rank=0)
-            array[i] = 1 if primo else 0
-            win.Unlock(rank=0)
+            val = array[i]
+            if val > 0:
+                array[i] = -1  # marcar como en revisión
+                win.Unlock(rank=0)
+
+                # Verificar si es primo
+                primo = es_primo(val)
+
+                win.Lock(rank=0)
+                array[i] = -2 if primo else 0
+                win.Unlock(rank=0)
+
+                encontrado = True
+            else:
+                win.Unlock(rank=0)
+        # Si nadie encontró nada en esta ronda, se termina
+        all_done = comm.allreduce(encontrado, op=MPI.LOR)
+        if not all_done:
+            break
+
+    comm.Barrier()
+    t1 = MPI.Wtime()
+
+    # El proceso 0 cuenta cuántos primos encontró
+    cantidad_primos = np.count_nonzero(array == -2) if rank == 0 else None
+    comm.Barrier()
+    win.Free()
+    return cantidad_primos, t1 - t0
 
-            encontrado = True
+
+def clasificar_sin_locks(comm, inicio, n, bloque, kernel="criba"):
+    """
+    Versión sin locks: el arreglo compartido (1 byte por número) se divide en
+    bloques disjuntos que cada rank reclama con un Fetch_and_op atómico sobre un
+    contador; como nadie más escribe en un bloque reclamado, los resultados se
+    escriben sin locks y solo hay una sincronización al final.
+    """
+    rank = comm.Get_rank()
+
+    win = MPI.Win.Allocate_shared(n if rank == 0 else 0, disp_unit=1, comm=comm)
+    buf, itemsize = win.Shared_query(0)
+    array = np.ndarray(buffer=buf, dtype=np.int8, shape=(n,))
+
+    base = primos_base(limite_base(inicio + n)) if kernel == "criba" else None
+
+    def procesar(a, b):
+        # a, b son posiciones del arreglo; el número es inicio + posición
+        if kernel == "criba":
+            marcas = marcar_primos(inicio + a, inicio + b, base)
         else:
-            win.Unlock(rank=0)
-    # Si nadie encontró nada en esta ronda, se termina
-    all_done = comm.allreduce(encontrado, op=MPI.LOR)
-    if not all_done:
-        break
-
-comm.Barrier()
-
-# El proceso 0 cuenta cuántos primos encontró
-if rank == 0:
-    cantidad_primos = np.count_nonzero(array == 1)
-    print(f"Total de primos de 4 dígitos encontrados: {cantidad_primos}")
+            marcas = np.fromiter((es_primo(v) for v in range(inicio + a, inicio + b)), dtype=bool, count=b - a)
+        array[a:b] = marcas
+        return 0
+
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    ejecutar_rma(comm, 0, n, procesar, Estadisticas(), minimo=bloque)
+    comm.Barrier()
+    t1 = MPI.Wtime()
+
+    cantidad_primos = int(np.count_nonzero(array)) if rank == 0 else None
+    comm.Barrier()
+    win.Free()
+    return cantidad_primos, t1 - t0
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Clasificación de primos en un arreglo de memoria compartida.")
+    parser.add_argument("--modo", choices=["locks", "libre", "comparar"], default="comparar",
+                        help="locks: versión original con win.Lock; libre: bloques con Fetch_and_op sin locks; "
+                             "comparar: ejecuta ambas (por defecto)")
+    parser.add_argument("--digitos", type=int, default=4, help="clasificar los números de este número de dígitos")
+    parser.add_argument("-n", type=int, default=None,
+                        help="cantidad de números a clasificar desde 10^(digitos-1) (por defecto, todos los de ese número de dígitos)")
+    parser.add_argument("--bloque", type=int, default=65536, help="tamaño mínimo de bloque de la versión sin locks")
+    parser.add_argument("--kernel", choices=["criba", "division"], default="criba",
+                        help="test de primalidad de la versión sin locks (division = el mismo que la versión con locks)")
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+
+    inicio = 10 ** (args.digitos - 1)
+    n = args.n if args.n is not None else 9 * inicio
+
+    tiempos = {}
+    if args.modo in ("locks", "comparar"):
+        cantidad, tiempos["locks"] = clasificar_con_locks(comm, inicio, n)
+        if rank == 0 and not args.json:
+            print(f"[locks] Total de primos encontrados: {cantidad} ({tiempos['locks']:.3f} s)")
+    if args.modo in ("libre", "comparar"):
+        cantidad, tiempos["libre"] = clasificar_sin_locks(comm, inicio, n, args.bloque, args.kernel)
+        if rank == 0 and not args.json:
+            print(f"[libre/{args.kernel}] Total de primos encontrados: {cantidad} ({tiempos['libre']:.3f} s)")
+
+    if rank == 0 and args.json:
+        # El tiempo principal es el de la versión sin locks si se ejecutó
+        salida.emitir_json("shared04", tiempos.get("libre", tiempos.get("locks")),
+                           {"primos": cantidad, "tiempos": tiempos}, args, workers=size)
+    elif rank == 0:
+        print(f"Números clasificados: {n} (desde {inicio}), procesos: {size}")
+        if len(tiempos) == 2 and tiempos["libre"] > 0:
+            print(f"Aceleración sin locks: {tiempos['locks'] / tiempos['libre']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
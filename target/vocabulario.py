@@ -0,0 +1,81 @@
+import numpy as np
+
+import compresion
+
+# Bytes que separan palabras, los mismos que usa bytes.split()
+_SEPARADORES = np.zeros(256, dtype=bool)
+_SEPARADORES[list(b" \t\n\r\x0b\x0c")] = True
+
+
+def normalizar(datos: bytes, case_sensitive=False) -> bytes:
+    """Pasa un bloque de bytes UTF-8 a minúsculas (igual que str.lower())."""
+    if case_sensitive:
+        return datos
+    if datos.isascii():
+        return datos.lower()
+    return datos.decode("utf-8").lower().encode("utf-8")
+
+
+def construir_tabla(path, case_sensitive=False) -> np.ndarray:
+    """
+    Lee el archivo de referencia y devuelve su vocabulario como un arreglo
+    ordenado de bytes (dtype 'S'). La posición de cada palabra en la tabla
+    es su ID int32.
+    """
+    palabras = normalizar(compresion.leer(path), case_sensitive).split()
+    if not palabras:
+        return np.empty(0, dtype="S1")
+    return np.unique(np.array(palabras))
+
+
+def tokenizar_ids(datos: bytes, tabla: np.ndarray) -> np.ndarray:
+    """
+    Convierte un texto ya normalizado en un arreglo int32 con el ID de cada
+    palabra en la tabla, o -1 si la palabra no está en el vocabulario.
+
+    Los tokens se delimitan sobre el arreglo de bytes (mismos separadores que
+    bytes.split()) y se copian columna a columna a una matriz del ancho de la
+    tabla, que se ve como un arreglo 'S' y se busca con searchsorted: no se
+    crea un objeto bytes por palabra.
+    """
+    texto = np.frombuffer(datos, dtype=np.uint8)
+    es_palabra = ~_SEPARADORES[texto]
+    bordes = np.diff(es_palabra.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    inicios = np.flatnonzero(bordes == 1)
+    largos = np.flatnonzero(bordes == -1) - inicios
+    if len(inicios) == 0 or len(tabla) == 0:
+        return np.full(len(inicios), -1, dtype=np.int32)
+
+    # Las palabras más largas que la tabla no pueden estar en ella
+    ancho = tabla.dtype.itemsize
+    matriz = np.zeros((len(inicios), ancho), dtype=np.uint8)
+    for col in range(ancho):
+        filas = np.flatnonzero(largos > col)
+        if len(filas) == 0:
+            break
+        matriz[filas, col] = texto[inicios[filas] + col]
+    tokens = matriz.view(tabla.dtype).ravel()
+    ids = np.minimum(np.searchsorted(tabla, tokens), len(tabla) - 1)
+    return np.where((largos <= ancho) & (tabla[ids] == tokens), ids, -1).astype(np.int32)
+
+
+def histograma_desde_conteo(conteo, tabla: np.ndarray) -> np.ndarray:
+    """Convierte un histograma {palabra (bytes): cuenta} en un histograma int64 por ID."""
+    if not conteo or len(tabla) == 0:
+        return np.zeros(len(tabla), dtype=np.int64)
+    palabras = np.array(list(conteo.keys()))
+    cuentas = np.fromiter(conteo.values(), dtype=np.int64, count=len(conteo))
+    ids = np.minimum(np.searchsorted(tabla, palabras), len(tabla) - 1)
+    dentro = tabla[ids] == palabras
+    return np.bincount(ids[dentro], weights=cuentas[dentro], minlength=len(tabla)).astype(np.int64)
+
+
+def contar_ids(ids: np.ndarray, n_vocab: int) -> np.ndarray:
+    """Histograma int64 de longitud fija n_vocab (ignora los IDs -1)."""
+    return np.bincount(ids[ids >= 0], minlength=n_vocab).astype(np.int64)
+
+
+def top_n_ids(histograma: np.ndarray, tabla: np.ndarray, top_n: int):
+    """Devuelve [(palabra, cuenta), ...] con las top_n palabras de mayor cuenta."""
+    orden = np.argsort(-histograma, kind="stable")[:top_n]
+    return [(tabla[i].decode("utf-8"), int(histograma[i])) for i in orden if histograma[i] > 0]
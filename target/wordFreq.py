@@ -1,44 +1,125 @@
+import argparse
 import os
 from collections import Counter
 import time
 
-def topN_palabras_file1_en_otros(dir_path, file1_name="file_01.txt", case_sensitive=False, top_n=10):
+from lectura import iterar_bloques, trozo_completo
+import aproximado
+import cache_tokens
+import compresion
+import consultas
+import incremental
+import salida
+
+def contar_archivo(ruta, palabras_unicas, case_sensitive=False, dir_cache=None, cache_hash=False, sketch=None):
+    """
+    Cuenta en un archivo las apariciones de las palabras de palabras_unicas.
+    Con sketch, el conteo de cada bloque se suma al sketch y se descarta.
+    """
+    if dir_cache:
+        conteo = cache_tokens.histograma_trozo(trozo_completo(ruta), dir_cache, case_sensitive, cache_hash)
+        conteo = cache_tokens.filtrar(conteo, palabras_unicas)
+        if sketch is not None:
+            sketch.agregar(conteo)
+            return Counter()
+        return conteo
+    freq = Counter()
+    # Lectura por bloques de tamaño fijo (los archivos generados son una sola línea)
+    for bloque in iterar_bloques(trozo_completo(ruta), case_sensitive):
+        for w in bloque.decode("utf-8").split():
+            if w in palabras_unicas:
+                freq[w] += 1
+        if sketch is not None:
+            sketch.agregar(freq)
+            freq = Counter()
+    return freq
+
+def topN_palabras_file1_en_otros(dir_path, file1_name="file_01.txt", case_sensitive=False, top_n=10,
+                                 dir_cache=None, cache_hash=False, estado_incremental=None, sketch=None,
+                                 informar=True):
     """
     Calcula el top N de palabras de file_01.txt según su frecuencia total
-    en el resto de archivos .txt dentro de dir_path.
+    en el resto de archivos .txt dentro de dir_path. Si se indica dir_cache,
+    los histogramas de los archivos sin cambios se leen de la caché. Con
+    estado_incremental solo se procesan los archivos nuevos o modificados
+    desde la ejecución anterior guardada en ese archivo (con informar se
+    imprime cuántos cambiaron). Con sketch (un aproximado.CountMin) el top N
+    es aproximado.
     """
-    path1 = os.path.join(dir_path, file1_name)
+    path1 = compresion.buscar(dir_path, file1_name)
     if not os.path.isfile(path1):
         raise FileNotFoundError(f"No se encontró '{file1_name}' en '{dir_path}'")
 
-    # Leer y normalizar palabras de file_01.txt
-    with open(path1, "r", encoding="utf-8") as f:
-        palabras1 = f.read().split()
+    # Leer y normalizar palabras de file_01.txt (o file_01.txt.gz, etc.)
+    palabras1 = compresion.leer(path1).decode("utf-8").split()
     if not case_sensitive:
         palabras1 = [w.lower() for w in palabras1]
     palabras_unicas = set(palabras1)
 
+    # Todos los .txt (comprimidos o no) exceptuando file_01.txt
+    rutas = [os.path.join(dir_path, fname) for fname in os.listdir(dir_path)
+             if compresion.es_texto(fname) and compresion.nombre_base(fname) != file1_name]
+
+    if estado_incremental:
+        estado = incremental.cargar_estado(estado_incremental,
+                                           incremental.firma_vocabulario(palabras_unicas, case_sensitive))
+        pendientes, eliminados = incremental.cambios(estado, rutas)
+        conteos = {ruta: contar_archivo(ruta, palabras_unicas, case_sensitive, dir_cache, cache_hash)
+                   for ruta in pendientes}
+        freq_global = incremental.aplicar(estado, pendientes, conteos, eliminados)
+        incremental.guardar_estado(estado_incremental, estado)
+        if informar:
+            print(f"Incremental: {len(pendientes)} archivos nuevos o modificados, {len(eliminados)} eliminados, "
+                  f"{len(rutas) - len(pendientes)} sin cambios")
+        return freq_global.most_common(top_n)
+
+    if sketch is not None:
+        for ruta in rutas:
+            contar_archivo(ruta, palabras_unicas, case_sensitive, dir_cache, cache_hash, sketch)
+        return sketch.top(palabras_unicas, top_n)
+
     # Contador global
     freq_global = Counter()
-
-    # Recorre todos los .txt exceptuando file_01.txt
-    for fname in os.listdir(dir_path):
-        if not fname.lower().endswith(".txt") or fname == file1_name:
-            continue
-        ruta = os.path.join(dir_path, fname)
-        with open(ruta, "r", encoding="utf-8") as f:
-            for linea in f:
-                palabras = linea.split()
-                if not case_sensitive:
-                    palabras = [w.lower() for w in palabras]
-                for w in palabras:
-                    if w in palabras_unicas:
-                        freq_global[w] += 1
+    for ruta in rutas:
+        freq_global.update(contar_archivo(ruta, palabras_unicas, case_sensitive, dir_cache, cache_hash))
 
     return freq_global.most_common(top_n)
 
+def topN_consultas(dir_path, nombres, case_sensitive=False, top_n=10, dir_cache=None, cache_hash=False,
+                   sketch=None):
+    """
+    Top N de cada archivo de consulta de nombres en una sola pasada por el
+    corpus: se cuenta la unión de sus vocabularios (las claves del índice
+    palabra -> consultas) y el conteo global se reparte con el índice.
+    """
+    lista = consultas.cargar(dir_path, nombres, case_sensitive)
+    indice = consultas.construir_indice(lista)
+    excluir = consultas.excluidos(lista, dir_path)
+    rutas = [os.path.join(dir_path, fname) for fname in os.listdir(dir_path)
+             if compresion.es_texto(fname) and compresion.nombre_base(fname) not in excluir]
+
+    freq_global = Counter()
+    for ruta in rutas:
+        freq_global.update(contar_archivo(ruta, indice, case_sensitive, dir_cache, cache_hash, sketch))
+    if sketch is not None:
+        return consultas.repartir_aproximado(sketch, lista, top_n)
+    return consultas.repartir(freq_global, lista, indice, top_n)
+
 def main():
-    # Parámetros fijos (no se usan opciones por línea de comandos)
+    # Solo la caché y el modo incremental se configuran por línea de comandos
+    parser = argparse.ArgumentParser(description="Top N de palabras de file_01.txt en el resto de archivos.")
+    cache_tokens.agregar_opciones(parser)
+    incremental.agregar_opciones(parser)
+    aproximado.agregar_opciones(parser)
+    consultas.agregar_opciones(parser)
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+    if args.consultas and args.incremental:
+        parser.error("--consultas no es compatible con --incremental (el manifiesto es de una sola consulta)")
+    if args.aproximado and args.incremental:
+        parser.error("--aproximado no es compatible con --incremental (el manifiesto guarda conteos exactos)")
+
+    # Parámetros fijos
     # Determine directory path
     # If /app exists (Docker), use it. Otherwise use the directory where the script is located.
     dir_path = "/app" if os.path.exists("/app") else os.path.dirname(os.path.abspath(__file__))
@@ -46,25 +127,60 @@ def main():
     case_sensitive = False                   # ¿Distinguir mayúsculas?
     top_n = 10                               # Número de palabras a extraer
 
+    sketch = aproximado.CountMin(args.epsilon, args.delta) if args.aproximado else None
+
     # Medir tiempo de ejecución
     t0 = time.perf_counter()
 
     try:
-        top_words = topN_palabras_file1_en_otros(
-            dir_path,
-            file1_name=file1_name,
-            case_sensitive=case_sensitive,
-            top_n=top_n
-        )
+        if args.consultas:
+            top_words = topN_consultas(dir_path, args.consultas, case_sensitive, top_n, args.cache,
+                                       args.cache_hash, sketch)
+        else:
+            top_words = topN_palabras_file1_en_otros(
+                dir_path,
+                file1_name=file1_name,
+                case_sensitive=case_sensitive,
+                top_n=top_n,
+                dir_cache=args.cache,
+                cache_hash=args.cache_hash,
+                estado_incremental=args.incremental,
+                sketch=sketch,
+                informar=not args.json
+            )
     except FileNotFoundError as e:
         print("Error:", e)
         return
 
     t1 = time.perf_counter()
     elapsed = t1 - t0
+    if args.cache:
+        cache_tokens.desalojar(args.cache, int(args.cache_mb * 2**20))
 
     # Salida
-    print(f"Tiempo de ejecución: {elapsed:.3f} segundos\n")
+    # Tiempo dentro del descompresor (incluido en el total) si hay archivos comprimidos
+    t_descompresion = compresion.tiempo_descompresion()
+    if args.json:
+        resultado = {"consultas": top_words} if args.consultas else {"top": top_words}
+        if sketch is not None:
+            resultado["aproximado"] = sketch.resumen()
+        salida.emitir_json("wordFreq", elapsed, resultado, args, workers=1, descompresion=t_descompresion)
+        return
+    print(f"Tiempo de ejecución: {elapsed:.3f} segundos")
+    if t_descompresion:
+        print(f"Descompresión: {t_descompresion:.3f} segundos")
+    print()
+    if args.consultas and sketch is not None:
+        for nombre, top in top_words.items():
+            aproximado.imprimir_top(top, sketch.resumen(), nombre)
+            print()
+        return
+    if args.consultas:
+        consultas.imprimir(top_words, top_n)
+        return
+    if sketch is not None:
+        aproximado.imprimir_top(top_words, sketch.resumen(), file1_name)
+        return
     print(f"Top {top_n} palabras de {file1_name} según frecuencia en otros archivos:")
     for palabra, cuenta in top_words:
         print(f"  {palabra}: {cuenta}")
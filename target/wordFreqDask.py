@@ -1,26 +1,103 @@
-import sys
+import argparse
+import math
 import os
 import time
 from collections import Counter
-from dask import delayed, compute
+from dask import delayed
 from dask.distributed import Client, LocalCluster
 
-def process_file(path, vocab):
+from particion import particionar, UMBRAL_DIVISION
+from lectura import iterar_bloques
+import aproximado
+import cache_tokens
+import compresion
+import consultas
+import granularidad
+import incremental
+import salida
+
+def process_file(chunk, vocab, cache_dir=None, cache_hash=False):
+    if cache_dir:
+        # Histograma completo del trozo desde la caché (o calculado y guardado)
+        return cache_tokens.filtrar(cache_tokens.histograma_trozo(chunk, cache_dir, False, cache_hash), vocab)
     counts = Counter()
-    with open(path, 'r', encoding='utf-8') as f:
-        # Leemos todo el contenido, pasamos a minusculas y dividimos
-        words = f.read().lower().split()
-        for w in words:
+    # Leemos el trozo por bloques ya en minusculas y dividimos cada bloque
+    for block in iterar_bloques(chunk):
+        for w in block.decode('utf-8').split():
             if w in vocab:
                 counts[w] += 1
     return counts
 
+def process_chunks(chunks, vocab, cache_dir=None, cache_hash=False):
+    # Una tarea por grupo de trozos equilibrado en bytes
+    counts = Counter()
+    for chunk in chunks:
+        counts.update(process_file(chunk, vocab, cache_dir, cache_hash))
+    return counts
+
+def process_chunks_sketch(chunks, vocab, epsilon, delta, cache_dir=None, cache_hash=False):
+    # Modo aproximado: cada tarea devuelve un Count-Min Sketch de tamaño fijo
+    sketch = aproximado.CountMin(epsilon, delta)
+    for chunk in chunks:
+        if cache_dir:
+            sketch.agregar(process_file(chunk, vocab, cache_dir, cache_hash))
+            continue
+        for block in iterar_bloques(chunk):
+            counts = Counter(w for w in block.decode('utf-8').split() if w in vocab)
+            sketch.agregar(counts)
+    return sketch
+
+def top_sketch(sketch, vocab, n):
+    return sketch.top(vocab, n), sketch.resumen()
+
+def top_sketch_queries(sketch, queries, n):
+    return consultas.repartir_aproximado(sketch, queries, n), sketch.resumen()
+
+def process_chunks_by_file(chunks, vocab, cache_dir=None, cache_hash=False):
+    # Igual que process_chunks pero separando los conteos por archivo (modo incremental)
+    counts = {}
+    for chunk in chunks:
+        counts.setdefault(chunk[0], Counter()).update(process_file(chunk, vocab, cache_dir, cache_hash))
+    return counts
+
+def merge_counts(partials):
+    # Suma varios Counter (un nodo interno del árbol de reducción)
+    total = Counter()
+    for partial in partials:
+        total.update(partial)
+    return total
+
+def top_words(counts, n):
+    return counts.most_common(n)
+
+def tree_reduce(tasks, combine, fan_in):
+    # Reducción en árbol dentro del cluster: cada nivel combina grupos de
+    # fan_in resultados hasta que queda una sola tarea
+    while len(tasks) > 1:
+        tasks = [delayed(combine)(tasks[i:i + fan_in]) for i in range(0, len(tasks), fan_in)]
+    return tasks[0] if tasks else delayed(combine)([])
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Uso: python wordFreqDask.py <n_workers>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Top 5 de palabras de file_01.txt en el resto de archivos (Dask).")
+    parser.add_argument("n_workers", type=int, help="Número de workers del cluster local")
+    parser.add_argument("--umbral-mb", type=float, default=UMBRAL_DIVISION / 2**20,
+                        help="archivos mayores que este tamaño (MB) se dividen en trozos por rango de bytes")
+    cache_tokens.agregar_opciones(parser)
+    incremental.agregar_opciones(parser)
+    granularidad.agregar_opciones(parser)
+    aproximado.agregar_opciones(parser)
+    consultas.agregar_opciones(parser)
+    parser.add_argument("--fan-in", type=int, default=8,
+                        help="resultados que combina cada tarea del árbol de reducción")
+    parser.add_argument("--top", type=int, default=5, help="cantidad de palabras más frecuentes a mostrar")
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+    if args.aproximado and args.incremental:
+        parser.error("--aproximado no es compatible con --incremental (el manifiesto guarda conteos exactos)")
+    if args.consultas and args.incremental:
+        parser.error("--consultas no es compatible con --incremental (el manifiesto es de una sola consulta)")
 
-    n_workers = int(sys.argv[1])
+    n_workers = args.n_workers
     
     # Iniciamos el cluster local
     cluster = LocalCluster(n_workers=n_workers, threads_per_worker=1, processes=True)
@@ -29,42 +106,141 @@ if __name__ == "__main__":
     # Detectar si estamos en docker o local
     work_dir = "/app" if os.path.exists("/app") else os.path.dirname(os.path.abspath(__file__))
     ref_file = "file_01.txt"
-    
-    ref_path = os.path.join(work_dir, ref_file)
-    if not os.path.exists(ref_path):
-        print(f"No se encontro {ref_file}")
-        sys.exit(1)
 
-    # Cargar palabras de referencia
-    with open(ref_path, 'r', encoding='utf-8') as f:
-        vocab = set(f.read().lower().split())
+    if args.consultas:
+        # Se cuenta la unión de los vocabularios y al final se reparte por consulta
+        try:
+            queries = consultas.cargar(work_dir, args.consultas)
+        except FileNotFoundError as e:
+            print("Error:", e)
+            raise SystemExit(1)
+        index = consultas.construir_indice(queries)
+        vocab = set(index)
+        excluded = consultas.excluidos(queries, work_dir)
+    else:
+        ref_path = compresion.buscar(work_dir, ref_file)
+        if not os.path.exists(ref_path):
+            print(f"No se encontro {ref_file}")
+            raise SystemExit(1)
+
+        # Cargar palabras de referencia
+        vocab = set(compresion.leer(ref_path).decode('utf-8').lower().split())
+        excluded = {ref_file}
 
-    # Buscar archivos .txt
+    # Buscar archivos .txt (comprimidos o no)
     files = []
     for f in os.listdir(work_dir):
-        if f.endswith(".txt") and f != ref_file:
+        if compresion.es_texto(f) and compresion.nombre_base(f) not in excluded:
             files.append(os.path.join(work_dir, f))
 
-    print(f"Procesando {len(files)} archivos...")
+    if not args.json:
+        print(f"Procesando {len(files)} archivos...")
 
     t_start = time.perf_counter()
 
+    # El vocabulario se envía una sola vez a todos los workers y las tareas
+    # lo referencian por su clave, en lugar de serializarlo dentro de cada una
+    # (la lista evita que scatter reparta los elementos del set por separado)
+    [vocab_ref] = client.scatter([vocab], broadcast=True, hash=False)
+    if args.consultas:
+        # Las consultas y el índice también, para que el grafo no crezca con ellas
+        queries_ref, index_ref = client.scatter([queries, index], broadcast=True, hash=False)
+
+    if args.incremental:
+        # Solo se procesan los archivos nuevos o modificados desde la última ejecución
+        state = incremental.cargar_estado(args.incremental, incremental.firma_vocabulario(vocab))
+        pending, removed = incremental.cambios(state, files)
+        work_files = list(pending)
+    else:
+        work_files = files
+
+    total_bytes = sum(os.path.getsize(f) for f in work_files)
+    if args.tarea_ms > 0 and total_bytes > 0:
+        # Piloto sobre el comienzo del archivo más grande para estimar bytes/s;
+        # los archivos pequeños se agrupan y los grandes se dividen hasta
+        # que cada tarea tenga unos bytes_por_tarea
+        largest = max(work_files, key=os.path.getsize)
+        speed, pilot_bytes, pilot_s = granularidad.calibrar(
+            client, process_chunks, lambda b: ([(largest, 0, b)], vocab_ref),
+            2**20, os.path.getsize(largest), args.tarea_ms / 1000)
+        bytes_per_task = granularidad.tamaño_tarea(speed, total_bytes, n_workers, args.tarea_ms / 1000, minimo=2**16)
+        groups = [g for g in particionar(work_files, math.ceil(total_bytes / bytes_per_task), bytes_per_task) if g]
+        if not args.json:
+            print(f"Granularidad: {bytes_per_task / 2**20:.2f} MB por tarea, {len(groups)} tareas "
+                  f"(objetivo {args.tarea_ms:.0f} ms; piloto de {pilot_bytes / 2**20:.2f} MB en "
+                  f"{pilot_s * 1000:.1f} ms)")
+        client.run(compresion.reiniciar_tiempo)
+    else:
+        # Repartir bytes entre tareas (LPT) en lugar de una tarea por archivo
+        groups = [g for g in particionar(work_files, n_workers, int(args.umbral_mb * 2**20)) if g]
+        if not args.json:
+            print(f"Granularidad: {len(groups)} tareas (una por worker)")
+
     # Generar grafo de tareas
-    tasks = [delayed(process_file)(f, vocab) for f in files]
+    cache_dir = os.path.abspath(args.cache) if args.cache else None
+    if args.aproximado:
+        tasks = [delayed(process_chunks_sketch)(g, vocab_ref, args.epsilon, args.delta, cache_dir, args.cache_hash)
+                 for g in groups]
+    else:
+        process = process_chunks_by_file if args.incremental else process_chunks
+        tasks = [delayed(process)(g, vocab_ref, cache_dir, args.cache_hash) for g in groups]
     
-    # Ejecutar
-    results = compute(*tasks)
-
-    # Unificar resultados
-    final_counts = Counter()
-    for res in results:
-        final_counts.update(res)
+    # Ejecutar y unificar resultados en el cluster
+    fan_in = max(2, args.fan_in)
+    if args.incremental:
+        # El manifiesto necesita los conteos por archivo en el cliente
+        per_file = tree_reduce(tasks, incremental.combinar_por_archivo, fan_in).compute()
+        final_counts = incremental.aplicar(state, pending, per_file, removed)
+        incremental.guardar_estado(args.incremental, state)
+        if not args.json:
+            print(f"Incremental: {len(pending)} archivos nuevos o modificados, {len(removed)} eliminados, "
+                  f"{len(files) - len(pending)} sin cambios")
+        top = final_counts.most_common(args.top)
+    elif args.aproximado:
+        # Los sketches se suman en el árbol; solo el top y la cota de error viajan al cliente
+        if not tasks:
+            tasks = [delayed(aproximado.CountMin)(args.epsilon, args.delta)]
+        sketch = tree_reduce(tasks, aproximado.combinar, fan_in)
+        if args.consultas:
+            top, summary = delayed(top_sketch_queries)(sketch, queries_ref, args.top).compute()
+        else:
+            top, summary = delayed(top_sketch)(sketch, vocab_ref, args.top).compute()
+    elif args.consultas:
+        # El conteo de la unión se reparte por consulta en el cluster
+        top = delayed(consultas.repartir)(tree_reduce(tasks, merge_counts, fan_in), queries_ref, index_ref,
+                                          args.top).compute()
+    else:
+        # Solo el top final viaja al cliente
+        top = delayed(top_words)(tree_reduce(tasks, merge_counts, fan_in), args.top).compute()
 
     t_end = time.perf_counter()
+    # Tiempo dentro del descompresor, sumado sobre los workers (si hay archivos comprimidos)
+    decompression = sum(client.run(compresion.tiempo_descompresion).values())
+    if cache_dir:
+        cache_tokens.desalojar(cache_dir, int(args.cache_mb * 2**20))
 
-    print(f"Tiempo de ejecución: {t_end - t_start:.3f} segundos\n")
-    print(f"Top 5 palabras de {ref_file} en otros archivos:")
-    for w, c in final_counts.most_common(5):
-        print(f"  {w}: {c}")
+    if args.json:
+        result = {"consultas": top} if args.consultas else {"top": top}
+        if args.aproximado:
+            result["aproximado"] = summary
+        salida.emitir_json("wordFreqDask", t_end - t_start, result, args, workers=n_workers, tareas=len(groups),
+                           descompresion=decompression)
+    else:
+        print(f"Tiempo de ejecución: {t_end - t_start:.3f} segundos")
+        if decompression:
+            print(f"Descompresión: {decompression:.3f} segundos (suma de los workers)")
+        print()
+        if args.consultas and args.aproximado:
+            for name, query_top in top.items():
+                aproximado.imprimir_top(query_top, summary, name)
+                print()
+        elif args.consultas:
+            consultas.imprimir(top, args.top)
+        elif args.aproximado:
+            aproximado.imprimir_top(top, summary, ref_file)
+        else:
+            print(f"Top {args.top} palabras de {ref_file} en otros archivos:")
+            for w, c in top:
+                print(f"  {w}: {c}")
 
     client.close()
@@ -1,92 +1,502 @@
 from mpi4py import MPI
+import argparse
 import os
 from collections import Counter
 
-def contar_palabras(archivos, palabras_buscar, case_sensitive=False):
+import numpy as np
+
+from vocabulario import construir_tabla, tokenizar_ids, contar_ids, histograma_desde_conteo, top_n_ids
+from particion import particionar, repartir_contiguo, UMBRAL_DIVISION
+from lectura import iterar_trozos, iterar_bloques, iterar_bloques_mmap, iterar_bloques_mpiio
+import aproximado
+import cache_tokens
+import compresion
+import consultas
+import incremental
+import instrumentacion
+import salida
+
+
+def contar_palabras(bloques, palabras_buscar, perfil=None, sketch=None):
+    # Con sketch (modo aproximado) el conteo de cada bloque se suma al
+    # sketch y se descarta, así que el contador devuelto queda vacío
     contador = Counter()
     
-    for archivo in archivos:
-        with open(archivo, "r", encoding="utf-8") as f:
-            texto = f.read().split()
-            if not case_sensitive:
-                texto = [p.lower() for p in texto]
-            for palabra in texto:
-                if palabra in palabras_buscar:
-                    contador[palabra] += 1
+    # Bloques de tamaño fijo ya pasados a minúsculas: memoria acotada
+    for bloque in bloques:
+        t0 = MPI.Wtime()
+        palabras = bloque.decode("utf-8").split()
+        t1 = MPI.Wtime()
+        for palabra in palabras:
+            if palabra in palabras_buscar:
+                contador[palabra] += 1
+        if sketch is not None:
+            sketch.agregar(contador)
+            contador = Counter()
+        if perfil:
+            perfil.sumar("tokenizacion", t1 - t0)
+            perfil.sumar("conteo", MPI.Wtime() - t1)
     
     return contador
 
 
+def contar_palabras_ids(bloques, tabla, perfil=None):
+    """Cuenta por ID de vocabulario; devuelve un histograma int64 de len(tabla)."""
+    histograma = np.zeros(len(tabla), dtype=np.int64)
+    for bloque in bloques:
+        t0 = MPI.Wtime()
+        ids = tokenizar_ids(bloque, tabla)
+        t1 = MPI.Wtime()
+        histograma += contar_ids(ids, len(tabla))
+        if perfil:
+            perfil.sumar("tokenizacion", t1 - t0)
+            perfil.sumar("conteo", MPI.Wtime() - t1)
+    return histograma
+
+
+def difundir_tabla(comm, tabla):
+    """Difunde la tabla de vocabulario de rank 0 como un único buffer de bytes."""
+    rank = comm.Get_rank()
+    dtype, n = comm.bcast((tabla.dtype.str, len(tabla)) if rank == 0 else None, root=0)
+    if rank != 0:
+        tabla = np.empty(n, dtype=dtype)
+    comm.Bcast([tabla.view(np.uint8), MPI.BYTE], root=0)
+    return tabla
+
+
+def sumar_contadores(a, b, datatype=None):
+    """
+    Combina dos Counter parciales (operación de reducción conmutativa).
+    mpi4py llama a las MPI.Op de usuario con un tercer argumento (datatype)
+    que en las reducciones de objetos Python vale None.
+    """
+    a.update(b)
+    return a
+
+
+def reducir_contadores(comm, contador_local, estrategia):
+    """Combina los Counter parciales en rank 0; devuelve None en los demás ranks."""
+    if estrategia == "colectiva":
+        # Reducción en árbol con una MPI.Op propia: la latencia en rank 0 crece con log P
+        op = MPI.Op.Create(sumar_contadores, commute=True)
+        try:
+            return comm.reduce(contador_local, op=op, root=0)
+        finally:
+            op.Free()
+
+    if comm.Get_rank() == 0:
+        contador_global = contador_local.copy()
+        
+        # Recibir de workers
+        for _ in range(1, comm.Get_size()):
+            contador_parcial = comm.recv(source=MPI.ANY_SOURCE)
+            for palabra, cuenta in contador_parcial.items():
+                contador_global[palabra] += cuenta
+        return contador_global
+    
+    comm.send(contador_local, dest=0)
+    return None
+
+
+def k_esima(conteo, k):
+    """k-ésima cuenta más alta de conteo (0 si tiene menos de k palabras)."""
+    valores = sorted(conteo.values(), reverse=True)
+    return valores[k - 1] if len(valores) >= k else 0
+
+
+def top_distribuido(comm, contador_local, k, perfil=None):
+    """
+    Top k exacto sin reunir los Counter completos en rank 0 (TPUT, umbral
+    uniforme en tres fases):
+      1. Cada rank envía su top k local. La k-ésima suma parcial tau1 es una
+         cota inferior de la k-ésima cuenta global; se difunde T = tau1 / P.
+      2. Cada rank envía las demás palabras con cuenta local >= T; una palabra
+         que un rank no envió vale menos de T en él. Con las nuevas sumas
+         parciales, candidatas = palabras cuya cota superior (suma + T por
+         cada rank que no la envió) alcanza la k-ésima suma parcial tau2.
+      3. Cada rank envía la cuenta exacta de las candidatas.
+    El volumen enviado crece con k y no con el vocabulario. Devuelve en
+    rank 0 (top, pares recibidos por fase y tamaño total de los Counter
+    locales); en el resto, (None, None).
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+
+    def reunir(obj):
+        if perfil:
+            perfil.mensaje(obj)
+        return comm.gather(obj, root=0)
+
+    # Fase 1: top k local (y tamaño del Counter local, solo para informar)
+    top_local = contador_local.most_common(k)
+    fase1 = reunir((top_local, len(contador_local)))
+    umbral = None
+    if rank == 0:
+        conocidos = [dict(pares) for pares, _ in fase1]
+        umbral = k_esima(sum((Counter(c) for c in conocidos), Counter()), k) / size
+    umbral = comm.bcast(umbral, root=0)
+
+    # Fase 2: el resto de palabras por encima del umbral
+    enviadas = dict(top_local)
+    fase2 = reunir([(p, c) for p, c in contador_local.items() if c >= umbral and p not in enviadas])
+    candidatas = None
+    if rank == 0:
+        parcial, vistas = Counter(), Counter()
+        for conocido, pares in zip(conocidos, fase2):
+            conocido.update(pares)
+            for p, c in conocido.items():
+                parcial[p] += c
+                vistas[p] += 1
+        tau2 = k_esima(parcial, k)
+        candidatas = sorted(p for p, s in parcial.items() if s + (size - vistas[p]) * umbral >= tau2)
+    candidatas = comm.bcast(candidatas, root=0)
+
+    # Fase 3: cuentas exactas de las candidatas, alineadas con la lista
+    fase3 = reunir([contador_local.get(p, 0) for p in candidatas])
+    if rank != 0:
+        return None, None
+    total = Counter(dict(zip(candidatas, map(sum, zip(*fase3)))))
+    estadisticas = {"fase1": sum(len(pares) for pares, _ in fase1), "fase2": sum(map(len, fase2)),
+                    "fase3": len(candidatas) * size, "umbral": umbral,
+                    "vocabulario_local": sum(n for _, n in fase1)}
+    return total.most_common(k), estadisticas
+
+
+def reducir_histogramas_nodo(comm, histograma_local):
+    """
+    Reducción en dos niveles. Los ranks de un mismo nodo escriben su histograma
+    en una fila de una matriz compartida (MPI.Win.Allocate_shared), suman entre
+    todos una franja de columnas cada uno y solo el líder de cada nodo participa
+    en el Reduce entre nodos. Devuelve el total en rank 0 y None en el resto.
+    """
+    nodo = comm.Split_type(MPI.COMM_TYPE_SHARED, key=comm.Get_rank())
+    rank_nodo = nodo.Get_rank()
+    size_nodo = nodo.Get_size()
+    n_vocab = len(histograma_local)
+
+    # Solo el líder del nodo reserva memoria: una fila por rank del nodo
+    win = MPI.Win.Allocate_shared(
+        size_nodo * n_vocab * 8 if rank_nodo == 0 else 0,
+        disp_unit=8,
+        comm=nodo
+    )
+    buf, itemsize = win.Shared_query(0)
+    assert itemsize == MPI.INT64_T.Get_size()
+    filas = np.ndarray(buffer=buf, dtype=np.int64, shape=(size_nodo, n_vocab))
+
+    filas[rank_nodo] = histograma_local
+    nodo.Barrier()
+
+    # Cada rank suma una franja de columnas distinta y la deja en la fila 0
+    a = n_vocab * rank_nodo // size_nodo
+    b = n_vocab * (rank_nodo + 1) // size_nodo
+    filas[0, a:b] = filas[:, a:b].sum(axis=0)
+    nodo.Barrier()
+
+    # Reducción entre líderes de nodo (rank 0 de COMM_WORLD es líder de su nodo)
+    lideres = comm.Split(0 if rank_nodo == 0 else MPI.UNDEFINED, key=comm.Get_rank())
+    histograma_global = None
+    if rank_nodo == 0:
+        total_nodo = filas[0].copy()
+        histograma_global = np.zeros_like(total_nodo) if comm.Get_rank() == 0 else None
+        lideres.Reduce([total_nodo, MPI.INT64_T],
+                       [histograma_global, MPI.INT64_T] if comm.Get_rank() == 0 else None,
+                       op=MPI.SUM, root=0)
+        lideres.Free()
+
+    nodo.Barrier()
+    win.Free()
+    nodo.Free()
+    return histograma_global
+
+
+def reducir_histogramas(comm, histograma_local, estrategia):
+    """Suma los histogramas int64 en rank 0; devuelve None en los demás ranks."""
+    rank = comm.Get_rank()
+    if estrategia == "nodo":
+        return reducir_histogramas_nodo(comm, histograma_local)
+    if estrategia == "colectiva":
+        histograma_global = np.zeros_like(histograma_local) if rank == 0 else None
+        comm.Reduce([histograma_local, MPI.INT64_T],
+                    [histograma_global, MPI.INT64_T] if rank == 0 else None,
+                    op=MPI.SUM, root=0)
+        return histograma_global
+
+    if rank == 0:
+        histograma_global = histograma_local.copy()
+        parcial = np.empty_like(histograma_local)
+        for _ in range(1, comm.Get_size()):
+            comm.Recv([parcial, MPI.INT64_T], source=MPI.ANY_SOURCE)
+            histograma_global += parcial
+        return histograma_global
+
+    comm.Send([histograma_local, MPI.INT64_T], dest=0)
+    return None
+
+
 def main():
     comm = MPI.COMM_WORLD
     rank = comm.Get_rank()
     size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Top N de palabras de file_01.txt en el resto de archivos (MPI).")
+    parser.add_argument("--modo", choices=["texto", "ids"], default="texto",
+                        help="texto: Counter de str (por defecto); ids: IDs int32 de vocabulario y Reduce numérico")
+    parser.add_argument("--estrategia", choices=["colectiva", "p2p", "nodo", "tput"], default="colectiva",
+                        help="colectiva: bcast/scatter y reduce en árbol (por defecto); p2p: send/recv desde rank 0; "
+                             "nodo: como colectiva, pero el histograma se reduce primero en memoria compartida "
+                             "dentro de cada nodo (requiere --modo ids); tput: como colectiva, pero el top N exacto "
+                             "se obtiene en tres fases con umbral sin reunir los Counter completos (requiere --modo texto)")
+    parser.add_argument("--umbral-mb", type=float, default=UMBRAL_DIVISION / 2**20,
+                        help="archivos mayores que este tamaño (MB) se dividen en trozos por rango de bytes")
+    parser.add_argument("--lector", choices=["bloques", "mmap", "mpiio"], default="bloques",
+                        help="bloques: lectura por bloques y reparto LPT (por defecto); mmap / mpiio: "
+                             "el corpus se corta en rangos de bytes contiguos, leídos con mmap o MPI.File.Read_at_all")
+    cache_tokens.agregar_opciones(parser)
+    incremental.agregar_opciones(parser)
+    aproximado.agregar_opciones(parser)
+    consultas.agregar_opciones(parser)
+    instrumentacion.agregar_opciones(parser)
+    salida.agregar_opciones(parser)
+    args = parser.parse_args()
+    if args.estrategia == "tput" and (args.modo != "texto" or args.incremental or args.aproximado):
+        parser.error("--estrategia tput requiere --modo texto y no es compatible con --incremental ni --aproximado")
+    if args.consultas and (args.modo != "texto" or args.incremental or args.estrategia == "tput"):
+        parser.error("--consultas requiere --modo texto y no es compatible con --incremental ni --estrategia tput")
+    if args.aproximado and (args.modo != "texto" or args.incremental):
+        parser.error("--aproximado requiere --modo texto y no es compatible con --incremental")
+    if args.cache and args.lector == "mpiio":
+        parser.error("--cache no es compatible con --lector mpiio (las lecturas colectivas no se pueden omitir)")
+    if args.estrategia == "nodo" and args.modo != "ids":
+        parser.error("--estrategia nodo requiere --modo ids (histograma indexado por ID de vocabulario)")
+    if args.incremental and (args.modo != "texto" or args.lector == "mpiio"):
+        parser.error("--incremental requiere --modo texto y un lector local (bloques o mmap)")
     
     # Determine directory path
     # If /app exists (Docker), use it. Otherwise use the directory where the script is located.
     dir_path = "/app" if os.path.exists("/app") else os.path.dirname(os.path.abspath(__file__))
     file1_name = "file_01.txt"
+    if args.lector == "mpiio" and any(compresion.formato(f) for f in os.listdir(dir_path)
+                                      if compresion.es_texto(f) and compresion.nombre_base(f) != file1_name):
+        # Todos los ranks ven el mismo directorio: se rechaza antes de abrir nada con MPI-IO
+        parser.error("--lector mpiio no admite archivos comprimidos; use --lector bloques o mmap")
     case_sensitive = False
     top_n = 5
     
     palabras_buscar = None
-    mis_archivos = []
+    tabla = None
+    archivos = None
+    repartos = None
+    perfil = instrumentacion.Perfil(comm, activo=args.perfil is not None)
     
     if rank == 0:
         t_inicio = MPI.Wtime()
+        t_preparacion = t_inicio
         
-        # Leer file_01.txt
-        path1 = os.path.join(dir_path, file1_name)
-        with open(path1, "r", encoding="utf-8") as f:
-            palabras1 = f.read().split()
-        
-        if not case_sensitive:
-            palabras1 = [p.lower() for p in palabras1]
-        palabras_buscar = set(palabras1)
+        # Leer file_01.txt (o su versión comprimida)
+        path1 = compresion.buscar(dir_path, file1_name)
+        excluir = {file1_name}
+        if args.consultas:
+            # Solo se cuenta la unión de los vocabularios; el índice reparte
+            # después el conteo global entre las consultas
+            lista_consultas = consultas.cargar(dir_path, args.consultas, case_sensitive)
+            indice = consultas.construir_indice(lista_consultas)
+            palabras_buscar = set(indice)
+            excluir = consultas.excluidos(lista_consultas, dir_path)
+        elif args.modo == "ids":
+            tabla = construir_tabla(path1, case_sensitive)
+        else:
+            palabras1 = compresion.leer(path1).decode("utf-8").split()
+            
+            if not case_sensitive:
+                palabras1 = [p.lower() for p in palabras1]
+            palabras_buscar = set(palabras1)
         
-        # Listar archivos a procesar
+        # Listar archivos a procesar (.txt, comprimidos o no)
         archivos = []
         for fname in os.listdir(dir_path):
-            if fname.endswith(".txt") and fname != file1_name:
+            if compresion.es_texto(fname) and compresion.nombre_base(fname) not in excluir:
                 archivos.append(os.path.join(dir_path, fname))
+
+        if args.incremental:
+            # Solo se reparten los archivos nuevos o modificados desde la última ejecución
+            estado = incremental.cargar_estado(args.incremental,
+                                               incremental.firma_vocabulario(palabras_buscar, case_sensitive))
+            pendientes, eliminados = incremental.cambios(estado, archivos)
+            n_archivos = len(archivos)
+            archivos = list(pendientes)
         
-        # Dividir archivos entre procesos
-        for i, archivo in enumerate(archivos):
-            if i % size == 0:
-                mis_archivos.append(archivo)
-        
-        # Enviar a workers
-        for dest in range(1, size):
-            archivos_worker = [a for i, a in enumerate(archivos) if i % size == dest]
-            comm.send(palabras_buscar, dest=dest)
-            comm.send(archivos_worker, dest=dest)
-    
+        if args.lector == "bloques":
+            # Repartir bytes (no número de archivos) entre procesos con LPT
+            repartos = particionar(archivos, size, int(args.umbral_mb * 2**20))
+        else:
+            # Rangos de bytes contiguos: un único archivo grande se reparte entre todos
+            repartos = repartir_contiguo(archivos, size)
+        perfil.sumar("preparacion", MPI.Wtime() - t_preparacion)
+
+    # Distribuir vocabulario y archivos
+    with perfil.fase("comunicacion"):
+        if args.estrategia != "p2p":
+            mis_trozos = comm.scatter(repartos, root=0)
+            perfil.mensaje(mis_trozos)
+            if args.modo != "ids":
+                palabras_buscar = comm.bcast(palabras_buscar, root=0)
+                perfil.mensaje(palabras_buscar)
+        elif rank == 0:
+            mis_trozos = repartos[0]
+            
+            # Enviar a workers
+            for dest in range(1, size):
+                if args.modo != "ids":
+                    comm.send(palabras_buscar, dest=dest)
+                    perfil.mensaje(palabras_buscar)
+                comm.send(repartos[dest], dest=dest)
+                perfil.mensaje(repartos[dest])
+        else:
+            if args.modo != "ids":
+                palabras_buscar = comm.recv(source=0)
+                perfil.mensaje(palabras_buscar)
+            mis_trozos = comm.recv(source=0)
+            perfil.mensaje(mis_trozos)
+
+    conteos = None
+    bloques = None
+    iterar = iterar_bloques_mmap if args.lector == "mmap" else iterar_bloques
+    if args.cache:
+        # Histogramas completos por trozo; los trozos sin cambios salen de la caché
+        conteos = perfil.iterar("lectura", (cache_tokens.histograma_trozo(
+            t, args.cache, case_sensitive, args.cache_hash, iterar) for t in mis_trozos))
+    elif args.lector == "mpiio":
+        # MPI.File.Open es colectiva: todos los ranks necesitan la lista completa
+        with perfil.fase("comunicacion"):
+            archivos = comm.bcast(archivos, root=0)
+            perfil.mensaje(archivos)
+        bloques = perfil.iterar("lectura", iterar_bloques_mpiio(comm, archivos, mis_trozos, case_sensitive))
     else:
-        palabras_buscar = comm.recv(source=0)
-        mis_archivos = comm.recv(source=0)
-    
-    # Procesar archivos
-    contador_local = contar_palabras(mis_archivos, palabras_buscar, case_sensitive)
+        bloques = perfil.iterar("lectura", iterar_trozos(mis_trozos, case_sensitive, args.lector))
+
+    # Procesar archivos y combinar resultados
+    if args.modo == "ids":
+        # El vocabulario se difunde una sola vez; cada rank cuenta IDs y se
+        # reduce un histograma int64 de longitud fija
+        with perfil.fase("comunicacion"):
+            tabla = difundir_tabla(comm, tabla)
+            perfil.mensaje(nbytes=tabla.nbytes)
+        if conteos is not None:
+            histograma_local = np.zeros(len(tabla), dtype=np.int64)
+            for conteo in conteos:
+                with perfil.fase("conteo"):
+                    histograma_local += histograma_desde_conteo(conteo, tabla)
+        else:
+            histograma_local = contar_palabras_ids(bloques, tabla, perfil)
+        perfil.barrera()
+        with perfil.fase("reduccion"):
+            histograma_global = reducir_histogramas(comm, histograma_local, args.estrategia)
+            perfil.mensaje(nbytes=histograma_local.nbytes)
+        if rank == 0:
+            top_words = top_n_ids(histograma_global, tabla, top_n)
+    elif args.aproximado:
+        # Sketch de tamaño fijo por rank, combinado con un Allreduce de la tabla
+        sketch = aproximado.CountMin(args.epsilon, args.delta)
+        if conteos is not None:
+            for conteo in conteos:
+                with perfil.fase("conteo"):
+                    sketch.agregar(cache_tokens.filtrar(conteo, palabras_buscar))
+        else:
+            contar_palabras(bloques, palabras_buscar, perfil, sketch)
+        perfil.barrera()
+        with perfil.fase("reduccion"):
+            comm.Allreduce(MPI.IN_PLACE, [sketch.tabla, MPI.INT64_T], op=MPI.SUM)
+            perfil.mensaje(nbytes=sketch.tabla.nbytes)
+        if rank == 0 and args.consultas:
+            top_words = consultas.repartir_aproximado(sketch, lista_consultas, top_n)
+        elif rank == 0:
+            top_words = sketch.top(palabras_buscar, top_n)
+    elif args.incremental:
+        # Conteos separados por archivo para poder actualizar el manifiesto
+        parcial = {}
+        for trozo in mis_trozos:
+            if args.cache:
+                conteo = cache_tokens.filtrar(cache_tokens.histograma_trozo(
+                    trozo, args.cache, case_sensitive, args.cache_hash, iterar), palabras_buscar)
+            else:
+                conteo = contar_palabras(perfil.iterar("lectura", iterar(trozo, case_sensitive)),
+                                         palabras_buscar, perfil)
+            parcial.setdefault(trozo[0], Counter()).update(conteo)
+        perfil.barrera()
+        with perfil.fase("reduccion"):
+            parciales = comm.gather(parcial, root=0)
+            perfil.mensaje(parcial)
+        if rank == 0:
+            conteos_archivo = incremental.combinar_por_archivo(parciales)
+            contador_global = incremental.aplicar(estado, pendientes, conteos_archivo, eliminados)
+            incremental.guardar_estado(args.incremental, estado)
+            if not args.json:
+                print(f"Incremental: {len(pendientes)} archivos nuevos o modificados, {len(eliminados)} "
+                      f"eliminados, {n_archivos - len(pendientes)} sin cambios")
+            top_words = contador_global.most_common(top_n)
+    else:
+        if conteos is not None:
+            contador_local = Counter()
+            for conteo in conteos:
+                with perfil.fase("conteo"):
+                    contador_local.update(cache_tokens.filtrar(conteo, palabras_buscar))
+        else:
+            contador_local = contar_palabras(bloques, palabras_buscar, perfil)
+        perfil.barrera()
+        with perfil.fase("reduccion"):
+            if args.estrategia == "tput":
+                top_words, estadisticas_tput = top_distribuido(comm, contador_local, top_n, perfil)
+            else:
+                perfil.mensaje(contador_local)
+                contador_global = reducir_contadores(comm, contador_local, args.estrategia)
+        if rank == 0 and args.consultas:
+            top_words = consultas.repartir(contador_global, lista_consultas, indice, top_n)
+        elif rank == 0 and args.estrategia != "tput":
+            top_words = contador_global.most_common(top_n)
     
     if rank == 0:
-        contador_global = contador_local.copy()
-        
-        # Recibir de workers
-        for _ in range(1, size):
-            contador_parcial = comm.recv(source=MPI.ANY_SOURCE)
-            for palabra, cuenta in contador_parcial.items():
-                contador_global[palabra] += cuenta
-        
         t_fin = MPI.Wtime()
+    # Tiempo en el descompresor (ya incluido en la lectura) del rank más lento
+    t_descompresion = comm.reduce(compresion.tiempo_descompresion(), op=MPI.MAX, root=0)
+    perfil.sumar("descompresion", compresion.tiempo_descompresion())
+    perfil.sumar("lectura", -compresion.tiempo_descompresion())
+
+    if rank == 0:
+        if args.cache:
+            cache_tokens.desalojar(args.cache, int(args.cache_mb * 2**20))
         
         # Resultados
-        print(f"Tiempo de ejecución: {t_fin - t_inicio:.3f} segundos\n")
-        print(f"Top {top_n} palabras de {file1_name} en otros archivos:")
-        for palabra, cuenta in contador_global.most_common(top_n):
-            print(f"  {palabra}: {cuenta}")
-    
-    else:
-        comm.send(contador_local, dest=0)
+        if args.json:
+            resultado = {"consultas": top_words} if args.consultas else {"top": top_words}
+            if args.aproximado:
+                resultado["aproximado"] = sketch.resumen()
+            if args.estrategia == "tput":
+                resultado["tput"] = estadisticas_tput
+            salida.emitir_json("wordFreqMPI", t_fin - t_inicio, resultado, args, workers=size,
+                               descompresion=t_descompresion)
+        else:
+            print(f"Tiempo de ejecución: {t_fin - t_inicio:.3f} segundos")
+            if t_descompresion:
+                print(f"Descompresión: {t_descompresion:.3f} segundos (rank más lento)")
+            if args.estrategia == "tput":
+                e = estadisticas_tput
+                print(f"TPUT: {e['fase1']} + {e['fase2']} + {e['fase3']} pares enviados a rank 0 "
+                      f"(umbral {e['umbral']:.1f}; reunir los Counter completos enviaría {e['vocabulario_local']})")
+            print()
+            if args.consultas and args.aproximado:
+                for nombre, top in top_words.items():
+                    aproximado.imprimir_top(top, sketch.resumen(), nombre)
+            elif args.consultas:
+                consultas.imprimir(top_words, top_n)
+            elif args.aproximado:
+                aproximado.imprimir_top(top_words, sketch.resumen(), file1_name)
+            else:
+                print(f"Top {top_n} palabras de {file1_name} en otros archivos:")
+                for palabra, cuenta in top_words:
+                    print(f"  {palabra}: {cuenta}")
+
+    if args.perfil:
+        perfil.emitir(args.perfil, "wordFreqMPI", modo=args.modo, estrategia=args.estrategia, lector=args.lector)
 
 
 if __name__ == "__main__":